@@ -1,14 +1,72 @@
+import io
 import os
+import copy
 import json
+import mmap
+import functools
+import threading
 import pandas as pd
 import geopandas as gpd
+import shapely
 import fiona
-from typing import List, Dict, Union, Optional
+from typing import List, Dict, Tuple, Union, Optional
 from urllib.parse import quote
 from sqlalchemy import create_engine, exc, text, inspect
+from sqlalchemy.engine import Engine
+from sqlalchemy.pool import QueuePool
 import psycopg2
+import psycopg2.pool
 from psycopg2 import sql
 
+try:
+    import orjson  # optional: faster JSON parser
+except ImportError:
+    orjson = None
+
+
+# Process-wide connection reuse, shared by every DBConnect instance
+_ENGINES: Dict[Tuple[str, bool], Engine] = {}
+_SP_POOLS: Dict[tuple, Tuple[psycopg2.pool.ThreadedConnectionPool, threading.BoundedSemaphore]] = {}
+_POOLS_LOCK = threading.Lock()
+
+SP_POOL_MAXCONN = 10       # default per-credentials cap on stored-procedure connections
+SP_POOL_TIMEOUT = 30.0     # seconds a caller waits for a free connection before PoolError
+
+
+@functools.lru_cache(maxsize=8)
+def _load_config_cached(config_file_path: str, mtime_ns: int) -> dict:
+    """
+    Parse db_config.json once per (path, mtime) pair.
+
+    Uses mmap + orjson when available to avoid an extra copy of the file contents.
+    Callers must not mutate the returned dict; deep-copy it first.
+    """
+    if orjson is not None:
+        with open(config_file_path, "rb") as f:
+            try:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm, memoryview(mm) as view:
+                    return orjson.loads(view)
+            except ValueError:
+                # Empty file (cannot be mapped) or invalid JSON; let json report the error
+                pass
+    with open(config_file_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def _adbc_connect(engine):
+    """Open an ADBC (Arrow-native) PostgreSQL connection to the engine's database."""
+    try:
+        import adbc_driver_postgresql.dbapi as adbc_pg  # type: ignore
+    except ImportError as e:
+        raise ImportError("Arrow methods require 'adbc-driver-postgresql' and 'pyarrow'.") from e
+    uri = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    return adbc_pg.connect(uri)
+
+
+def _load_config(config_file_path: str) -> dict:
+    """Return the parsed db_config.json, re-reading only when the file changed."""
+    return _load_config_cached(config_file_path, os.stat(config_file_path).st_mtime_ns)
+
 
 class DBConnect:
     """
@@ -23,6 +81,8 @@ class DBConnect:
     - DatabaseStoredProcedureExecutor: Execute PostgreSQL stored procedures.
     """
 
+    __slots__ = ("_version", "config_file_path")
+
     def __init__(self, config_file_path: str = None):
         """
         Initialize DBConnect and store configuration path.
@@ -70,9 +130,10 @@ class DBConnect:
         """Create and return a DatabaseExtractor instance."""
         return self.DatabaseExtractor(connection, engine)
 
-    def stored_procedure_executor(self, creds):
+    def stored_procedure_executor(self, creds, max_connections: int = SP_POOL_MAXCONN,
+                                  pool_timeout: float = SP_POOL_TIMEOUT):
         """Create and return a DatabaseStoredProcedureExecutor instance."""
-        return self.DatabaseStoredProcedureExecutor(creds)
+        return self.DatabaseStoredProcedureExecutor(creds, max_connections, pool_timeout)
 
     # ===== Sub-Classes =====
 
@@ -86,6 +147,8 @@ class DBConnect:
         - Checking table existence
         """
 
+        __slots__ = ("environment", "engine", "conn", "_status", "_environments", "environment_creds")
+
         def __init__(self, config_file_path: str, environment: str):
             """
             Initialize Connector.
@@ -101,8 +164,7 @@ class DBConnect:
             if not os.path.exists(config_file_path):
                 raise FileNotFoundError(f"Config file not found: {config_file_path}")
 
-            with open(config_file_path, "r", encoding="utf-8") as f:
-                self._environments = json.load(f)["environments"]
+            self._environments = _load_config(config_file_path)["environments"]
 
             if environment not in self._environments:
                 raise KeyError(f"Environment '{environment}' not found.")
@@ -113,6 +175,38 @@ class DBConnect:
             self.conn = None
             self._status = "Not Connected"
 
+        def _get_engine(self, echo: bool = False) -> Engine:
+            """
+            Return the pooled engine for this environment, creating it on first use.
+
+            Args:
+                echo (bool): If True, enable SQLAlchemy SQL echo.
+
+            Returns:
+                Engine: SQLAlchemy engine backed by a QueuePool.
+            """
+            creds = self.environment_creds
+            url = (f"postgresql://{creds['USER']}:{quote(creds['PASS'])}"
+                   f"@{creds['HOST']}:{creds['PORT']}/{creds['NAME']}")
+            # Keyed on the full DSN so edited credentials get a fresh pool; echo is part of
+            # the key because it is fixed per engine (a shared engine is never mutated)
+            key = (url, echo)
+            with _POOLS_LOCK:
+                engine = _ENGINES.get(key)
+                if engine is None:
+                    engine = create_engine(
+                        url,
+                        poolclass=QueuePool,
+                        pool_size=10,
+                        max_overflow=20,
+                        pool_pre_ping=True,
+                        pool_recycle=1800,
+                        future=True,
+                        echo=echo
+                    )
+                    _ENGINES[key] = engine
+            return engine
+
         def connect(self, echo: bool = False) -> bool:
             """
             Connect to the database.
@@ -125,11 +219,7 @@ class DBConnect:
             """
             try:
                 creds = self.environment_creds
-                self.engine = create_engine(
-                    f"postgresql://{creds['USER']}:{quote(creds['PASS'])}"
-                    f"@{creds['HOST']}:{creds['PORT']}/{creds['NAME']}",
-                    echo=echo
-                )
+                self.engine = self._get_engine(echo)
                 self.conn = self.engine.connect()
                 self._status = f"Connected to {self.environment} ({creds['NAME']})"
                 print(f"[Connected] {self._status}")
@@ -139,10 +229,9 @@ class DBConnect:
                 return False
 
         def disconnect(self):
-            """Close the current database connection."""
+            """Return the current connection to the pool."""
             if self.conn:
                 self.conn.close()
-                self.engine.dispose()
                 self.conn = None
                 self.engine = None
                 self._status = "Not Connected"
@@ -156,12 +245,7 @@ class DBConnect:
                 bool: True if successful, False otherwise.
             """
             try:
-                creds = self.environment_creds
-                temp_engine = create_engine(
-                    f"postgresql://{creds['USER']}:{quote(creds['PASS'])}"
-                    f"@{creds['HOST']}:{creds['PORT']}/{creds['NAME']}"
-                )
-                with temp_engine.connect() as conn:
+                with self._get_engine().connect() as conn:
                     conn.execute(text("SELECT 1"))
                 print("[Test Connection] Successful")
                 return True
@@ -181,8 +265,8 @@ class DBConnect:
                 bool: True if table exists, False otherwise.
             """
             try:
-                inspector = inspect(self.engine)
-                exists = inspector.has_table(table_name, schema=schema)
+                with (self.engine or self._get_engine()).connect() as conn:
+                    exists = inspect(conn).has_table(table_name, schema=schema)
                 print(f"[Table Exists] {schema}.{table_name}: {exists}")
                 return exists
             except exc.SQLAlchemyError as e:
@@ -200,6 +284,8 @@ class DBConnect:
         - Listing environments
         """
 
+        __slots__ = ("config_file_path", "config_data")
+
         def __init__(self, config_file_path: str):
             self.config_file_path = config_file_path
             self._load_config()
@@ -210,8 +296,7 @@ class DBConnect:
                 self.config_data = {"environments": {}}
                 self._save_config()
             else:
-                with open(self.config_file_path, "r", encoding="utf-8") as f:
-                    self.config_data = json.load(f)
+                self.config_data = copy.deepcopy(_load_config(self.config_file_path))
                 if "environments" not in self.config_data:
                     self.config_data["environments"] = {}
 
@@ -219,6 +304,7 @@ class DBConnect:
             """Save the current configuration to db_config.json."""
             with open(self.config_file_path, "w", encoding="utf-8") as f:
                 json.dump(self.config_data, f, indent=4)
+            _load_config_cached.cache_clear()
 
         def list_environments(self) -> list:
             """Return list of available environments."""
@@ -301,15 +387,45 @@ class DBConnect:
                 case ".shp" | ".geojson":
                     return gpd.read_file(file_path)
                 case ".csv":
-                    return pd.read_csv(file_path)
+                    return self._read_csv(file_path)
                 case ".xlsx" | ".xlsm" | ".xls" | ".xlsb":
                     if not file_sheetname:
                         raise ValueError(f"Sheet name must be provided for Excel file: {file}")
-                    return pd.read_excel(file_path, sheet_name=file_sheetname)
+                    return self._read_excel(file_path, file_sheetname)
                 case ".zip":
                     raise ValueError(f"Unsupported .zip content: {file}")
                 case _:
                     raise ValueError(f"Unsupported file type: {ext}")
+
+        # ---------- Internals ----------
+
+        @staticmethod
+        def _read_csv(file_path: str) -> pd.DataFrame:
+            """
+            Read a CSV file with pyarrow's multi-threaded parser, whatever its size, so one
+            engine (and one type inference) handles every file.
+            Falls back to pandas' default parser if pyarrow is unavailable.
+            """
+            try:
+                from pyarrow import csv as pa_csv  # type: ignore
+            except ImportError:
+                return pd.read_csv(file_path)
+            read_options = pa_csv.ReadOptions(use_threads=True, block_size=8 << 20)
+            return pa_csv.read_csv(file_path, read_options=read_options).to_pandas()
+
+        @staticmethod
+        def _read_excel(file_path: str, sheet_name: str) -> pd.DataFrame:
+            """
+            Read an Excel sheet with the Rust-based calamine engine (python-calamine).
+            Falls back to pandas' default engine if calamine is unavailable.
+            """
+            try:
+                return pd.read_excel(file_path, sheet_name=sheet_name, engine="calamine")
+            except (ImportError, ValueError) as e:
+                # Older pandas raises ValueError for an unknown engine name
+                if isinstance(e, ValueError) and "calamine" not in str(e):
+                    raise
+                return pd.read_excel(file_path, sheet_name=sheet_name)
     
     
     class GDBReader:
@@ -392,13 +508,15 @@ class DBConnect:
         Import large datasets efficiently into PostgreSQL/PostGIS.
         """
 
+        __slots__ = ("sql_conn", "sql_engine")
+
         def __init__(self, connection, engine):
             if not (connection and engine):
                 raise ValueError("Valid connection and engine required.")
             self.sql_conn = connection
             self.sql_engine = engine
 
-        def data_import(self, df, table_name: str, schema: str, if_exists="replace", chunksize=10000, method="multi"):
+        def data_import(self, df, table_name: str, schema: str, if_exists="replace", chunksize=10000, method="copy"):
             """
             Import Pandas DataFrame into PostgreSQL efficiently.
 
@@ -408,15 +526,22 @@ class DBConnect:
                 schema (str): Schema name.
                 if_exists (str): replace, append, or fail.
                 chunksize (int): Number of rows per batch.
-                method (str): Pandas insert method (multi recommended).
+                method (str): "copy" (default) streams rows via COPY FROM STDIN;
+                              any other value is passed to pandas to_sql (e.g. "multi").
             """
             try:
-                df_copy = df.copy()
-                df_copy.to_sql(
-                    table_name, self.sql_engine, if_exists=if_exists, index=False,
-                    schema=schema, chunksize=chunksize, method=method
-                )
-                print(f"[DataDumper] Imported {len(df_copy)} rows into {schema}.{table_name}")
+                if method == "copy":
+                    # Let pandas create/replace the table (DDL only), then bulk load with COPY
+                    df.head(0).to_sql(
+                        table_name, self.sql_engine, if_exists=if_exists, index=False, schema=schema
+                    )
+                    self._copy_from_dataframe(df, table_name, schema, chunksize)
+                else:
+                    df.to_sql(
+                        table_name, self.sql_engine, if_exists=if_exists, index=False,
+                        schema=schema, chunksize=chunksize, method=method
+                    )
+                print(f"[DataDumper] Imported {len(df)} rows into {schema}.{table_name}")
             except Exception as e:
                 print(f"[DataDumper Error] {e}")
 
@@ -432,27 +557,124 @@ class DBConnect:
                 chunksize (int): Number of rows per batch.
             """
             try:
-                gdf = gpd.GeoDataFrame(df.copy(), geometry="geometry")
-                gdf.to_postgis(
-                    table_name, self.sql_engine, if_exists=if_exists, index=False,
-                    schema=schema, chunksize=chunksize
+                if isinstance(df, gpd.GeoDataFrame) and df._geometry_column_name is not None:
+                    gdf = df
+                else:
+                    gdf = gpd.GeoDataFrame(df, geometry="geometry", copy=False)
+                srid = (gdf.crs.to_epsg() if gdf.crs is not None else None) or 0
+                # Let GeoPandas create/replace the table (DDL only). It can't infer the geometry
+                # type from zero rows, so pass the full frame's type/SRID as the column dtype.
+                gdf.head(0).to_postgis(
+                    table_name, self.sql_engine, if_exists=if_exists, index=False, schema=schema,
+                    dtype={gdf.geometry.name: self._geometry_dtype(gdf.geometry, srid)}
+                )
+                self._copy_from_dataframe(
+                    gdf, table_name, schema, chunksize, geometry_col=gdf.geometry.name, srid=srid
                 )
                 print(f"[DataDumper] Imported {len(gdf)} geo rows into {schema}.{table_name}")
             except Exception as e:
                 print(f"[DataDumper Error] {e}")
 
+        def arrow_import(self, table, table_name: str, schema: str, if_exists="replace"):
+            """
+            Import a pyarrow Table into PostgreSQL via ADBC's columnar COPY,
+            without converting to pandas first.
+
+            Args:
+                table (pyarrow.Table): Data to import.
+                table_name (str): Destination table.
+                schema (str): Schema name.
+                if_exists (str): replace, append, or fail.
+            """
+            modes = {"replace": "replace", "append": "create_append", "fail": "create"}
+            try:
+                if if_exists not in modes:
+                    raise ValueError(f"if_exists must be one of {list(modes)}")
+                with _adbc_connect(self.sql_engine) as conn:
+                    with conn.cursor() as cur:
+                        cur.adbc_ingest(table_name, table, mode=modes[if_exists], db_schema_name=schema)
+                    conn.commit()
+                print(f"[DataDumper] Imported {table.num_rows} rows into {schema}.{table_name}")
+            except Exception as e:
+                print(f"[DataDumper Error] {e}")
+
+        # ---------- Internals ----------
+
+        def _copy_from_dataframe(
+            self, df, table_name: str, schema: str, chunksize: int,
+            geometry_col: Optional[str] = None, srid: int = 0
+        ):
+            """
+            Stream DataFrame rows into an existing table with COPY FROM STDIN (CSV).
+            Geometry values are sent as hex (E)WKB, which PostGIS parses on input.
+            All chunks are loaded in a single transaction.
+            """
+            copy_sql = sql.SQL("COPY {}.{} ({}) FROM STDIN WITH (FORMAT CSV, NULL '\\N')").format(
+                sql.Identifier(schema),
+                sql.Identifier(table_name),
+                sql.SQL(", ").join(sql.Identifier(str(c)) for c in df.columns),
+            )
+            raw_conn = self.sql_engine.raw_connection()
+            try:
+                with raw_conn.cursor() as cur:
+                    copy_sql = copy_sql.as_string(cur)
+                    for start in range(0, len(df), chunksize):
+                        chunk = df.iloc[start:start + chunksize]
+                        if geometry_col:
+                            chunk = pd.DataFrame(chunk).assign(
+                                **{geometry_col: self._to_hex_wkb(chunk[geometry_col], srid)}
+                            )
+                        buf = io.StringIO()
+                        chunk.to_csv(buf, index=False, header=False, na_rep="\\N")
+                        buf.seek(0)
+                        cur.copy_expert(copy_sql, buf)
+                raw_conn.commit()
+            except Exception:
+                raw_conn.rollback()
+                raise
+            finally:
+                raw_conn.close()
+
+        @staticmethod
+        def _geometry_dtype(geoms, srid: int):
+            """
+            geoalchemy2 column type for a GeoSeries: its single geometry type (with Z if any
+            geometry has it), else generic GEOMETRY. Mixed single/multi types stay generic
+            because the rows are COPYed as-is, not promoted to Multi* like to_postgis does.
+            """
+            from geoalchemy2 import Geometry  # required by GeoPandas' to_postgis anyway
+
+            types = geoms.geom_type.dropna().unique()
+            geometry_type = types[0].upper() if len(types) == 1 else "GEOMETRY"
+            if geometry_type != "GEOMETRY" and geoms.has_z.any():
+                geometry_type += "Z"
+            return Geometry(geometry_type=geometry_type, srid=srid or -1)
+
+        @staticmethod
+        def _to_hex_wkb(geoms, srid: int):
+            """Encode a GeoSeries as hex WKB, embedding the SRID (EWKB) when known."""
+            values = geoms.to_numpy()
+            if srid > 0:
+                values = shapely.set_srid(values, srid)
+            return shapely.to_wkb(values, hex=True, include_srid=srid > 0)
+
     class DatabaseExtractor:
         """
         Extract/query data from PostgreSQL/PostGIS databases.
         """
 
+        __slots__ = ("sql_conn", "sql_engine")
+
         def __init__(self, connection, engine):
             if not (connection and engine):
                 raise ValueError("Valid connection and engine required.")
             self.sql_conn = connection
             self.sql_engine = engine
 
-        def get_data(self, table_name: str, schema: str, columns="*", row_limit=0):
+        # Rows buffered client-side per fetch from the server-side cursor
+        STREAM_BUFFER_ROWS = 10_000
+
+        def get_data(self, table_name: str, schema: str, columns="*", row_limit=0, chunksize: Optional[int] = None):
             """
             Get data from a table.
 
@@ -461,14 +683,30 @@ class DBConnect:
                 schema (str): Schema name.
                 columns (str/list): Columns to select.
                 row_limit (int): Limit number of rows.
+                chunksize (int, optional): If set, return an iterator of DataFrames
+                                           with this many rows each.
             """
-            cols = ",".join(columns) if isinstance(columns, (list, tuple)) else columns
-            limit = f"LIMIT {row_limit}" if row_limit > 0 else ""
-            query = f"SELECT {cols} FROM {schema}.{table_name} {limit};"
-            result = self.sql_conn.execute(text(query))
-            return pd.DataFrame(result, columns=result.keys())
+            query = self._select_query(table_name, schema, columns, row_limit)
+            return self._read_streamed(query, chunksize)
+
+        def arrow_get_data(self, table_name: str, schema: str, columns="*", row_limit=0):
+            """
+            Get data from a table as a pyarrow Table via ADBC (columnar, no per-row
+            Python objects). Call .to_pandas() on the result for a DataFrame.
+
+            Args:
+                table_name (str): Table name.
+                schema (str): Schema name.
+                columns (str/list): Columns to select.
+                row_limit (int): Limit number of rows.
+            """
+            query = self._select_query(table_name, schema, columns, row_limit)
+            with _adbc_connect(self.sql_engine) as conn:
+                with conn.cursor() as cur:
+                    cur.execute(query)
+                    return cur.fetch_arrow_table()
         
-        def get_data_with_custom_query(self, sql_query: str, safe_mode: bool = True):
+        def get_data_with_custom_query(self, sql_query: str, safe_mode: bool = True, chunksize: Optional[int] = None):
             """
             Execute a custom SQL query and return the results as a Pandas DataFrame.
 
@@ -486,6 +724,9 @@ class DBConnect:
                 safe_mode (bool, optional):
                     If True (default), only allows safe, read-only queries
                     (SELECT or WITH ... SELECT) and blocks destructive SQL.
+                chunksize (int, optional):
+                    If set, return an iterator of DataFrames with this many rows each.
+                    Only applies in safe mode, where results are streamed.
 
             Returns:
                 pd.DataFrame:
@@ -515,9 +756,37 @@ class DBConnect:
                     if f" {kw} " in cleaned_query or cleaned_query.startswith(kw):
                         raise ValueError(f"Query contains forbidden keyword: {kw.upper()}")
 
+                # Read-only queries can be streamed from a server-side cursor
+                return self._read_streamed(sql_query, chunksize)
+
             # Execute the query
             result = self.sql_conn.execute(text(sql_query))
             return pd.DataFrame(result, columns=result.keys())
+
+        # ---------- Internals ----------
+
+        def _select_query(self, table_name: str, schema: str, columns="*", row_limit=0) -> str:
+            """Build a SELECT for get_data/arrow_get_data, composed with psycopg2.sql."""
+            if isinstance(columns, str):
+                columns = [c.strip() for c in columns.split(",")]
+            cols = sql.SQL(", ").join(sql.SQL("*") if c == "*" else sql.Identifier(c) for c in columns)
+            query = sql.SQL("SELECT {cols} FROM {sch}.{tbl}").format(
+                cols=cols, sch=sql.Identifier(schema), tbl=sql.Identifier(table_name)
+            )
+            if row_limit > 0:
+                query = sql.SQL("{q} LIMIT {lim}").format(q=query, lim=sql.Literal(int(row_limit)))
+            # Render with the underlying psycopg2 connection (needed for quoting)
+            return query.as_string(self.sql_conn.connection.dbapi_connection)
+
+        def _read_streamed(self, query: str, chunksize: Optional[int] = None):
+            """
+            Load a SELECT into pandas through a server-side (named) cursor so rows
+            are fetched in batches instead of being materialized up front.
+            """
+            stmt = text(query).execution_options(
+                stream_results=True, max_row_buffer=chunksize or self.STREAM_BUFFER_ROWS
+            )
+            return pd.read_sql_query(stmt, self.sql_conn, chunksize=chunksize)
         
 
 
@@ -526,20 +795,61 @@ class DBConnect:
         Executes PostgreSQL stored procedures.
         - execute_sp() handles single SP (with or without parameters)
         - execute_multiple_sps() handles multiple SPs (with or without parameters in the same batch)
+        - execute_sps() sends multiple SPs to the server in a single round-trip
+
+        Connections come from a pool shared by every executor with the same credentials and
+        max_connections. At most max_connections are open at once; further callers block for
+        up to pool_timeout seconds for one to be returned, then get psycopg2.pool.PoolError.
         """
 
-        def __init__(self, environment_creds: dict):
+        __slots__ = ("creds", "max_connections", "pool_timeout")
+
+        def __init__(self, environment_creds: dict, max_connections: int = SP_POOL_MAXCONN,
+                     pool_timeout: float = SP_POOL_TIMEOUT):
             self.creds = environment_creds
+            self.max_connections = max_connections
+            self.pool_timeout = pool_timeout
+
+        def _get_pool(self) -> Tuple[psycopg2.pool.ThreadedConnectionPool, threading.BoundedSemaphore]:
+            """Return the shared pool (and its checkout semaphore) for these credentials, creating it once."""
+            key = (tuple(sorted((k, str(v)) for k, v in self.creds.items())), self.max_connections)
+            with _POOLS_LOCK:
+                entry = _SP_POOLS.get(key)
+                if entry is None:
+                    pool = psycopg2.pool.ThreadedConnectionPool(
+                        minconn=1,
+                        maxconn=self.max_connections,
+                        dbname=self.creds["NAME"],
+                        user=self.creds["USER"],
+                        password=self.creds["PASS"],
+                        host=self.creds["HOST"],
+                        port=self.creds["PORT"]
+                    )
+                    entry = _SP_POOLS[key] = (pool, threading.BoundedSemaphore(self.max_connections))
+            return entry
 
         def _get_connection(self):
-            """Create a new database connection."""
-            return psycopg2.connect(
-                dbname=self.creds["NAME"],
-                user=self.creds["USER"],
-                password=self.creds["PASS"],
-                host=self.creds["HOST"],
-                port=self.creds["PORT"]
-            )
+            """Borrow a database connection, waiting up to pool_timeout for a free slot."""
+            pool, slots = self._get_pool()
+            # getconn() raises as soon as the pool is exhausted; the semaphore makes callers queue instead
+            if not slots.acquire(timeout=self.pool_timeout):
+                raise psycopg2.pool.PoolError(
+                    f"no free connection after {self.pool_timeout}s "
+                    f"(max_connections={self.max_connections})"
+                )
+            try:
+                return pool.getconn()
+            except Exception:
+                slots.release()
+                raise
+
+        def _release_connection(self, conn):
+            """Return a borrowed connection to the pool (open transactions are rolled back)."""
+            pool, slots = self._get_pool()
+            try:
+                pool.putconn(conn)
+            finally:
+                slots.release()
 
         def execute_sp(self, sp_template: str, params: list | None = None):
             """
@@ -583,7 +893,7 @@ class DBConnect:
                 return None
             finally:
                 cursor.close()
-                conn.close()
+                self._release_connection(conn)
 
         def execute_multiple_sps(self, sp_calls: list, stop_on_error: bool = True):
             """
@@ -645,8 +955,47 @@ class DBConnect:
                 return results
             finally:
                 cursor.close()
-                conn.close()
+                self._release_connection(conn)
+
+        def execute_sps(self, sp_calls: list):
+            """
+            Execute multiple stored procedures in a single round-trip and transaction.
+
+            All CALL statements are bound client-side and sent to the server as one
+            batch, so N procedures cost one network round-trip instead of N.
+            OUT parameters are not collected; use execute_multiple_sps() when you need them.
+
+            Args:
+                sp_calls (list): Same format as execute_multiple_sps():
+                                - ("proc_name()", None) → no params
+                                - ("proc_name(?,?,?)", [param1, param2, param3]) → with params
+
+            Returns:
+                bool: True if every procedure ran and the batch was committed.
+            """
+            if not sp_calls:
+                return True
+
+            conn = self._get_connection()
+            cursor = conn.cursor()
+            try:
+                batch = b";\n".join(
+                    cursor.mogrify(f"CALL {sp_template.replace('?', '%s')}", params)
+                    if params and "?" in sp_template
+                    else cursor.mogrify(f"CALL {sp_template}")
+                    for sp_template, params in sp_calls
+                )
+                cursor.execute(batch)
+                conn.commit()
+                print(f"[SPExecutor] Executed {len(sp_calls)} procedure(s) in one batch. Transaction committed.")
+                return True
+
+            except psycopg2.Error as e:
+                conn.rollback()
+                print(f"[SPExecutor Error] Batch rolled back: {e}")
+                return False
+            finally:
+                cursor.close()
+                self._release_connection(conn)
 
-                
-                
         
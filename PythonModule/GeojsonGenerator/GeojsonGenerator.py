@@ -1,24 +1,103 @@
 # pg_to_geojson.py
 from __future__ import annotations
 
+import io
 import os
+import queue
 import sys
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from dataclasses import dataclass, field
 from typing import Dict, Iterable, List, Optional, Sequence
 
 import psycopg2
+import psycopg2.pool
 from psycopg2 import sql
 
 
-@dataclass
+class _BackgroundWriter(io.BufferedIOBase):
+    """
+    Binary sink that hands batched writes to a background thread, so disk writes
+    overlap with fetching the next rows from PostgreSQL.
+
+    Also counts rows (newlines) for progress reporting. Not being a TextIOBase,
+    it receives COPY data from psycopg2's copy_expert as raw bytes, which pass
+    straight through to the file without being decoded into Python strings.
+    str writes (from the cursor path) are encoded as UTF-8.
+    """
+
+    def __init__(self, f, every: int, on_progress=None, max_pending: int = 8) -> None:
+        super().__init__()
+        self._f = f
+        self._every = max(int(every), 1)
+        self._on_progress = on_progress
+        self.rows = 0
+
+        self._buf: List[bytes] = []
+        self._buf_rows = 0
+        self._queue: queue.Queue = queue.Queue(maxsize=max_pending)
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        n = data.count(b"\n")
+        before = self.rows
+        self.rows += n
+        self._buf.append(data)
+        self._buf_rows += n
+        if self._buf_rows >= self._every:
+            self._flush_buffer()
+        if self._on_progress and self.rows // self._every != before // self._every:
+            self._on_progress(self.rows)
+        return len(data)
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        try:
+            self._flush_buffer()
+        finally:
+            self._queue.put(None)
+            self._thread.join()
+            super().close()
+        if self._error is not None:
+            raise self._error
+
+    def _flush_buffer(self) -> None:
+        if self._error is not None:
+            raise self._error
+        if self._buf:
+            self._queue.put(b"".join(self._buf))
+            self._buf = []
+            self._buf_rows = 0
+
+    def _drain(self) -> None:
+        while True:
+            chunk = self._queue.get()
+            if chunk is None:
+                return
+            if self._error is None:
+                try:
+                    self._f.write(chunk)
+                except BaseException as e:  # surfaced to the producer on next flush/close
+                    self._error = e
+
+
+@dataclass(slots=True)
 class GeojsonGenerator:
     """
     Stream PostGIS tables to GeoJSON FeatureCollections with per-table geometry column override.
 
     Features:
-      - Server-side cursor streaming (memory-safe on huge tables)
-      - RFC 7946 Feature construction in-database (ST_AsGeoJSON + jsonb)
+      - COPY ... TO STDOUT streaming (memory-safe on huge tables); named cursor fallback
+      - RFC 7946 Feature construction in-database (ST_AsGeoJSON text, no jsonb round-trip)
       - 'columns': "*" or omit => all non-geometry columns; or pass a subset list
       - Per-table WHERE, params, ORDER BY
       - Optional on-the-fly reprojection via target_srid
@@ -49,20 +128,52 @@ class GeojsonGenerator:
     geometry_column: str = "geom"  # global default; can be overridden per table
     batch_size: int = 10_000
     show_progress: bool = True
+    exact_count: bool = False  # True => progress total from COUNT(*) (extra scan); else a pg_class estimate
+    use_copy: bool = True  # COPY ... TO STDOUT; set False to stream via a named cursor instead
+    max_workers: int = 4   # tables exported concurrently by export_many
 
     # ---- Internal ----
-    _conn: Optional[psycopg2.extensions.connection] = field(default=None, init=False, repr=False)
+    _pool: Optional[psycopg2.pool.ThreadedConnectionPool] = field(default=None, init=False, repr=False)
+    _pool_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _print_lock: threading.Lock = field(default_factory=threading.Lock, init=False, repr=False)
+    _query_cache: Dict[tuple, sql.SQL] = field(default_factory=dict, init=False, repr=False)
+
+    def _get_pool(self) -> psycopg2.pool.ThreadedConnectionPool:
+        """Create the shared connection pool on first use."""
+        with self._pool_lock:
+            if self._pool is None:
+                self._pool = psycopg2.pool.ThreadedConnectionPool(
+                    minconn=min(2, self.max_workers),
+                    maxconn=max(self.max_workers, 1) + 2,
+                    host=self.host, dbname=self.dbname, user=self.user,
+                    password=self.password, port=self.port,
+                )
+            return self._pool
 
     @contextmanager
     def _connect(self):
-        conn = psycopg2.connect(
-            host=self.host, dbname=self.dbname, user=self.user,
-            password=self.password, port=self.port,
-        )
+        pool = self._get_pool()
+        conn = pool.getconn()
+        if conn.encoding != "UTF8":
+            # COPY bytes are written to the file verbatim, so they must be UTF-8
+            conn.set_client_encoding("UTF8")
         try:
             yield conn
         finally:
-            conn.close()
+            # The pool rolls back any open transaction before reuse
+            pool.putconn(conn)
+
+    def close(self) -> None:
+        """Close all pooled connections."""
+        with self._pool_lock:
+            if self._pool is not None:
+                self._pool.closeall()
+                self._pool = None
+
+    def _log(self, msg: str, file=None) -> None:
+        # Serialized so concurrent exports don't interleave lines
+        with self._print_lock:
+            print(msg, file=file)
 
     # ---------- helpers ----------
 
@@ -83,28 +194,47 @@ class GeojsonGenerator:
             cur.execute(q, where_params or [])
             return int(cur.fetchone()[0])
 
+    def _estimate_rows(self, conn, table: str, schema: str) -> Optional[int]:
+        """
+        Planner row estimate from pg_class.reltuples (no table scan).
+        Returns None if the table has never been analyzed.
+        """
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT reltuples::bigint FROM pg_class "
+                "WHERE oid = (quote_ident(%s) || '.' || quote_ident(%s))::regclass",
+                [schema, table],
+            )
+            row = cur.fetchone()
+        if row is None or row[0] is None or row[0] <= 0:
+            return None
+        return int(row[0])
+
     def _geom_expr(self, geom_col: str, target_srid: Optional[int]) -> sql.Composed:
         """
         Build the geometry expression for a given geometry column name.
+        ST_AsGeoJSON already returns JSON text, so it is used as-is (no jsonb cast).
         """
         g = sql.Identifier(geom_col)
         if target_srid is None:
-            return sql.SQL("ST_AsGeoJSON(t.{g})::jsonb").format(g=g)
-        return sql.SQL("ST_AsGeoJSON(ST_Transform(t.{g}, {srid}))::jsonb").format(
+            return sql.SQL("ST_AsGeoJSON(t.{g})").format(g=g)
+        return sql.SQL("ST_AsGeoJSON(ST_Transform(t.{g}, {srid}))").format(
             g=g, srid=sql.Literal(int(target_srid))
         )
 
     def _props_expr(self, columns: Optional[Sequence[str]], geom_col: str) -> sql.Composed:
         """
-        Properties expression:
-          - None/empty => all non-geometry columns: to_jsonb(t) - '<geom_col>'
-          - Subset => to_jsonb((SELECT r FROM (SELECT t.c1, t.c2, ...) r))
+        Properties expression (JSON text):
+          - None/empty => all non-geometry columns: (to_jsonb(t) - '<geom_col>')::text
+          - Subset => to_jsonb((SELECT r FROM (SELECT t.c1, t.c2, ...) r))::text
+        Both go through jsonb so json-typed columns are re-serialized without raw newlines
+        (the COPY CSV path in _copy_features would otherwise quote such rows).
         """
         if not columns:
-            return sql.SQL("to_jsonb(t) - {}").format(sql.Literal(geom_col))
+            return sql.SQL("(to_jsonb(t) - {})::text").format(sql.Literal(geom_col))
         cols = [sql.SQL("t.{}").format(sql.Identifier(c)) for c in columns]
         sub = sql.SQL("SELECT r FROM (SELECT {}) r").format(sql.SQL(", ").join(cols))
-        return sql.SQL("to_jsonb(({}))").format(sub)
+        return sql.SQL("to_jsonb(({}))::text").format(sub)
 
     def _build_query(
         self,
@@ -120,12 +250,19 @@ class GeojsonGenerator:
         sch = sql.Identifier(schema)
         tbl = sql.Identifier(table)
 
-        geom_jsonb = self._geom_expr(geom_col, target_srid)
-        props_jsonb = self._props_expr(columns, geom_col)
+        geom_json = self._geom_expr(geom_col, target_srid)
+        props_json = self._props_expr(columns, geom_col)
 
+        # Concatenate the Feature as text instead of jsonb_build_object(...)::text,
+        # which would parse the GeoJSON into jsonb only to serialize it again.
         feature_expr = sql.SQL(
-            "jsonb_build_object('type','Feature','geometry', {g}, 'properties', COALESCE({p}, '{{}}'::jsonb))::text AS feature"
-        ).format(g=geom_jsonb, p=props_jsonb)
+            "{head} || {g} || {mid} || COALESCE({p}, '{{}}') || '}}' AS feature"
+        ).format(
+            head=sql.Literal('{"type":"Feature","geometry":'),
+            g=geom_json,
+            mid=sql.Literal(',"properties":'),
+            p=props_json,
+        )
 
         q = sql.SQL("SELECT {feature} FROM {sch}.{tbl} t WHERE t.{geom} IS NOT NULL").format(
             feature=feature_expr, sch=sch, tbl=tbl, geom=sql.Identifier(geom_col)
@@ -139,6 +276,119 @@ class GeojsonGenerator:
 
         return q
 
+    def _get_query(
+        self,
+        conn,
+        *,
+        schema: str,
+        table: str,
+        columns: Optional[Sequence[str]],
+        geom_col: str,
+        where_sql: Optional[str],
+        order_by: Optional[str],
+        target_srid: Optional[int],
+    ) -> sql.SQL:
+        """
+        Return the feature query rendered once per signature and reused afterwards,
+        so repeated exports of the same shape skip composing the sql.Composed tree.
+        """
+        key = (schema, table, tuple(columns) if columns else None, geom_col, where_sql, order_by, target_srid)
+        query = self._query_cache.get(key)
+        if query is None:
+            if len(self._query_cache) >= 128:
+                self._query_cache.clear()
+            composed = self._build_query(
+                schema=schema,
+                table=table,
+                columns=columns,
+                geom_col=geom_col,
+                where_sql=where_sql,
+                order_by=order_by,
+                target_srid=target_srid,
+            )
+            query = sql.SQL(composed.as_string(conn))
+            self._query_cache[key] = query
+        return query
+
+    def _report(self, label: str, written: int, total: Optional[int], estimated: bool = False) -> None:
+        if total and self.show_progress:
+            pct = (written / max(total, 1)) * 100.0
+            mark = "~" if estimated else ""
+            self._log(f"[{label}] {written}/{mark}{total} ({mark}{pct:.1f}%)", file=sys.stderr)
+
+    def _copy_features(
+        self,
+        conn,
+        f,
+        query: sql.Composable,
+        where_params: Optional[Sequence[object]],
+    ) -> int:
+        """
+        Stream features with COPY ... TO STDOUT straight into the output sink.
+
+        Separators are prepended server-side, so every COPY row is already a
+        valid FeatureCollection fragment. CSV format with control characters as
+        QUOTE/DELIMITER keeps the JSON text verbatim (text format would escape
+        backslashes).
+        """
+        rows = sql.SQL(
+            "SELECT CASE WHEN row_number() OVER () = 1 THEN '' ELSE ',' END || q.feature "
+            "FROM ({q}) q WHERE q.feature IS NOT NULL"
+        ).format(q=query)
+        copy_sql = sql.SQL(
+            "COPY ({rows}) TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')"
+        ).format(rows=rows)
+
+        with conn.cursor() as cur:
+            # COPY cannot take bind parameters, so inline them client-side
+            copy_text = cur.mogrify(copy_sql, where_params or []).decode(
+                psycopg2.extensions.encodings[conn.encoding]
+            )
+            before = f.rows
+            cur.copy_expert(copy_text, f)
+        return f.rows - before
+
+    def _fetch_features(
+        self,
+        conn,
+        f,
+        query: sql.Composable,
+        where_params: Optional[Sequence[object]],
+        label: str,
+    ) -> int:
+        """
+        Stream features through a named (server-side) cursor, one write per batch.
+        """
+        # Cursors are planned for fast-start (cursor_tuple_fraction = 0.1) by default;
+        # an export reads every row, so plan for total throughput instead.
+        with conn.cursor() as setup:
+            setup.execute("SET LOCAL cursor_tuple_fraction = 1.0")
+
+        # Forward-only, non-holdable cursor; larger FETCHes mean fewer round-trips
+        cur = conn.cursor(name=f"cur_{label.replace('.', '_')}", scrollable=False, withhold=False)
+        cur.itersize = max(self.batch_size, 20_000)
+        cur.arraysize = cur.itersize
+        cur.execute(query, where_params or [])
+
+        first = True
+        written = 0
+        while True:
+            rows = cur.fetchmany(cur.itersize)
+            if not rows:
+                break
+
+            chunk = [r[0] for r in rows if r[0] is not None]
+            if not chunk:
+                continue
+
+            # One write per batch instead of several per feature
+            f.write(("\n" if first else ",\n") + ",\n".join(chunk))
+            first = False
+            written += len(chunk)
+
+        cur.close()
+        return written
+
     # ---------- public API ----------
 
     def export_table(
@@ -176,18 +426,23 @@ class GeojsonGenerator:
         eff_geom = geometry_column or self.geometry_column
 
         with self._connect() as conn:
+            # Progress total: a cheap estimate for whole-table exports; an exact
+            # COUNT(*) (a second full scan) only when exact_count is set.
             total = None
+            estimated = False
             if self.show_progress:
                 try:
-                    total = self._count_rows(conn, table, eff_schema, where_sql, where_params)
+                    if self.exact_count:
+                        total = self._count_rows(conn, table, eff_schema, where_sql, where_params)
+                    elif not (where_sql and where_sql.strip()):
+                        total = self._estimate_rows(conn, table, eff_schema)
+                        estimated = True
                 except Exception as e:
-                    print(f"[warn] count(*) failed: {e}", file=sys.stderr)
+                    conn.rollback()
+                    self._log(f"[warn] row count failed: {e}", file=sys.stderr)
 
-            # Named cursor for streaming
-            cur = conn.cursor(name=f"cur_{eff_schema}_{table}")
-            cur.itersize = self.batch_size
-
-            query = self._build_query(
+            query = self._get_query(
+                conn,
                 schema=eff_schema,
                 table=table,
                 columns=columns,
@@ -196,43 +451,29 @@ class GeojsonGenerator:
                 order_by=order_by,
                 target_srid=target_srid,
             )
-            cur.execute(query, where_params or [])
-
-            # Stream write
-            with open(output_path, "w", encoding="utf-8") as f:
-                f.write('{"type":"FeatureCollection","features":[')
-                first = True
-                written = 0
-
-                while True:
-                    rows = cur.fetchmany(self.batch_size)
-                    if not rows:
-                        break
-
-                    for (feature_text,) in rows:
-                        if feature_text is None:
-                            continue
-                        if first:
-                            first = False
-                        else:
-                            f.write(",")
-                        f.write("\n")
-                        f.write(feature_text)
-                        written += 1
-
-                        if total and self.show_progress and written % self.batch_size == 0:
-                            pct = (written / max(total, 1)) * 100.0
-                            print(f"[{eff_schema}.{table}] {written}/{total} ({pct:.1f}%)", file=sys.stderr)
-
-                f.write("\n]}")
+            label = f"{eff_schema}.{table}"
+
+            # Stream write; the actual file writes happen on a background thread
+            with open(output_path, "wb") as out:
+                f = _BackgroundWriter(
+                    out, every=self.batch_size, on_progress=lambda n: self._report(label, n, total, estimated)
+                )
+                try:
+                    f.write('{"type":"FeatureCollection","features":[')
+                    if self.use_copy:
+                        written = self._copy_features(conn, f, query, where_params)
+                        f.write("]}")
+                    else:
+                        written = self._fetch_features(conn, f, query, where_params, label)
+                        f.write("\n]}")
+                finally:
+                    f.close()
 
             if self.show_progress:
-                if total is not None:
-                    print(f"[{eff_schema}.{table}] done: {written}/{total} (100%)")
+                if total is not None and not estimated:
+                    self._log(f"[{label}] done: {written}/{total} (100%)")
                 else:
-                    print(f"[{eff_schema}.{table}] done: {written} features")
-
-            cur.close()
+                    self._log(f"[{label}] done: {written} features")
 
     def export_many(self, items: Iterable[Dict[str, object]]) -> None:
         """
@@ -249,19 +490,33 @@ class GeojsonGenerator:
             "schema": "aero",                     # per-table schema (optional)
             "geometry_column": "shape"            # per-table geometry column (optional)
           }
+
+        Tables are exported concurrently (up to max_workers), each on its own
+        pooled connection.
         """
-        for item in items:
-            self.export_table(
-                table=item["table"],  # type: ignore[index]
-                output_path=item["output"],  # type: ignore[index]
-                columns=item.get("columns"),  # type: ignore[arg-type]
-                where_sql=(item.get("where_sql") or item.get("where") or item.get("filter") or None),  # type: ignore[arg-type]
-                where_params=item.get("where_params"),  # type: ignore[arg-type]
-                order_by=item.get("order_by"),  # type: ignore[arg-type]
-                target_srid=item.get("target_srid"),  # type: ignore[arg-type]
-                schema=item.get("schema"),  # type: ignore[arg-type]
-                geometry_column=item.get("geometry_column"),  # type: ignore[arg-type]
-            )
+        items = list(items)
+        if self.max_workers <= 1 or len(items) <= 1:
+            for item in items:
+                self._export_item(item)
+            return
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self._export_item, item) for item in items]
+            for future in futures:
+                future.result()  # re-raise the first failure
+
+    def _export_item(self, item: Dict[str, object]) -> None:
+        self.export_table(
+            table=item["table"],  # type: ignore[index]
+            output_path=item["output"],  # type: ignore[index]
+            columns=item.get("columns"),  # type: ignore[arg-type]
+            where_sql=(item.get("where_sql") or item.get("where") or item.get("filter") or None),  # type: ignore[arg-type]
+            where_params=item.get("where_params"),  # type: ignore[arg-type]
+            order_by=item.get("order_by"),  # type: ignore[arg-type]
+            target_srid=item.get("target_srid"),  # type: ignore[arg-type]
+            schema=item.get("schema"),  # type: ignore[arg-type]
+            geometry_column=item.get("geometry_column"),  # type: ignore[arg-type]
+        )
 
 
 # ----------------------------- CLI-style example -----------------------------
@@ -309,4 +564,5 @@ if __name__ == "__main__":
     ]
 
     exporter.export_many(tasks)
+    exporter.close()
     print("All exports finished.")
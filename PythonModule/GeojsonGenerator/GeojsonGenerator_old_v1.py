@@ -1,13 +1,31 @@
 # geojson_from_dataframe.py
 from __future__ import annotations
 
+import functools
 import json
 import re
 from dataclasses import dataclass, field
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple, Union
 
+import numpy as np
 import pandas as pd
 
+try:
+    import orjson
+except ImportError:  # optional: faster JSON encoding in to_file
+    orjson = None
+
+try:
+    from numba import njit, prange
+except ImportError:  # optional: compiled point finalization
+    njit = None
+
+try:
+    import shapely
+    import shapely.geometry
+except ImportError:  # optional: batch parsing of non-POINT WKT
+    shapely = None
+
 
 GeometryLike = Dict[str, Any]  # GeoJSON-like dict
 
@@ -17,6 +35,73 @@ _POINT_WKT_RE = re.compile(
     re.IGNORECASE,
 )
 
+# Value types json can write without conversion
+_JSON_NATIVE = (str, int, float, bool, dict, list)
+
+# List depth of "coordinates" down to (and including) the array rounded in one NumPy call
+_COORD_NESTING = {
+    "Point": 1,
+    "LineString": 1,
+    "MultiPoint": 1,
+    "Polygon": 2,
+    "MultiLineString": 2,
+    "MultiPolygon": 3,
+}
+
+
+def _parse_point_wkt(raw: str) -> Optional[Tuple[float, float]]:
+    """
+    Parse 'POINT (lon lat)' with plain string ops (fixed grammar, no regex VM);
+    None if `raw` is not a 2D WKT POINT.
+    """
+    s = raw.strip()
+    if s[:5].upper() != "POINT" or not s.endswith(")"):
+        return None
+    body = s[5:].lstrip()
+    if not body.startswith("("):
+        return None
+    try:
+        lon_s, lat_s = body[1:-1].split()
+        return float(lon_s), float(lat_s)
+    except ValueError:
+        return None
+
+
+def _wgs84_mask(lon: np.ndarray, lat: np.ndarray) -> np.ndarray:
+    """True where lon/lat is a valid WGS84 position (NaN compares False)."""
+    return (lon >= -180.0) & (lon <= 180.0) & (lat >= -90.0) & (lat <= 90.0)
+
+
+def _in_wgs84(lon: float, lat: float) -> bool:
+    return -180.0 <= lon <= 180.0 and -90.0 <= lat <= 90.0
+
+
+if njit is not None:
+    @njit(cache=True, parallel=True)
+    def _finalize_points(lon, lat, precision):
+        """
+        Round lon/lat into an (n, 2) array and flag valid WGS84 rows, in one
+        compiled pass spread across cores.
+        """
+        n = lon.shape[0]
+        out = np.empty((n, 2))
+        valid = np.empty(n, np.bool_)
+        scale = 10.0 ** precision
+        for i in prange(n):
+            lo = lon[i]
+            la = lat[i]
+            ok = lo >= -180.0 and lo <= 180.0 and la >= -90.0 and la <= 90.0
+            valid[i] = ok
+            if ok:
+                out[i, 0] = np.round(lo * scale) / scale
+                out[i, 1] = np.round(la * scale) / scale
+        return out, valid
+else:
+    def _finalize_points(lon: np.ndarray, lat: np.ndarray, precision: int) -> Tuple[np.ndarray, np.ndarray]:
+        """NumPy equivalent of the numba kernel: (n, 2) rounded coords and valid-row mask."""
+        out = np.round(np.column_stack((lon, lat)), precision)
+        return out, _wgs84_mask(lon, lat)
+
 
 @dataclass
 class DataFrameToGeoJSON:
@@ -34,51 +119,57 @@ class DataFrameToGeoJSON:
     id_col: Optional[str] = None
     properties: Optional[Sequence[str]] = None  # which columns to include as properties
     dropna: bool = True                         # drop rows with missing coords/geometry
-    precision: int = 6                          # rounding precision for coordinates
-    _excluded_cols: set = field(default_factory=set, init=False)
+    precision: Optional[int] = 6                # rounding precision for coordinates; None = keep as-is
+    _excluded_cols: frozenset = field(default_factory=frozenset, init=False)
+    _prop_cols: Tuple[str, ...] = field(default=(), init=False, repr=False)
+    _geom_fn: Optional[Callable[[Any], Optional[GeometryLike]]] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
         self._validate_init()
-        self._excluded_cols = {self.id_col, self.lat_col, self.lon_col, self.geometry_col}
-        self._excluded_cols = {c for c in self._excluded_cols if c}
+        self._excluded_cols = frozenset(
+            c for c in (self.id_col, self.lat_col, self.lon_col, self.geometry_col) if c
+        )
+        if self.properties is not None:
+            self._prop_cols = tuple(self.properties)
+        else:
+            self._prop_cols = tuple(c for c in self.df.columns if c not in self._excluded_cols)
+        if self.geometry_col:
+            self._geom_fn = self._select_geom_fn()
 
     def to_feature_collection(self) -> Dict[str, Any]:
-        features: List[Dict[str, Any]] = []
+        return {"type": "FeatureCollection", "features": list(self.iter_features())}
 
-        it = self.df.itertuples(index=False, name=None)
-        cols = list(self.df.columns)
-
-        for row in it:
-            rec = dict(zip(cols, row))
-
-            try:
-                geom = self._build_geometry(rec)
-            except ValueError as e:
-                if self.dropna:
-                    continue
-                raise
-
-            if geom is None:
-                if self.dropna:
-                    continue
-                raise ValueError("Geometry could not be constructed for row: %r" % rec)
-
-            feat: Dict[str, Any] = {
-                "type": "Feature",
-                "geometry": geom,
-                "properties": self._build_properties(rec),
-            }
-            if self.id_col and self.id_col in rec and pd.notna(rec[self.id_col]):
-                feat["id"] = rec[self.id_col]
-
-            features.append(feat)
-
-        return {"type": "FeatureCollection", "features": features}
+    def iter_features(self) -> Iterator[Dict[str, Any]]:
+        """Yield Feature dicts one at a time (no full feature list in memory)."""
+        if self.geometry_col:
+            rows, geoms = self._column_geometries()
+        else:
+            rows, geoms = self._latlon_geometries()
+        return self._assemble(rows, geoms)
 
-    def to_file(self, path: str, indent: int = 2) -> None:
-        fc = self.to_feature_collection()
-        with open(path, "w", encoding="utf-8") as f:
-            json.dump(fc, f, ensure_ascii=False, indent=indent)
+    def to_file(self, path: str, indent: Optional[int] = 2) -> None:
+        """
+        Stream the FeatureCollection to `path`, encoding one feature at a time.
+        Uses orjson when installed (indent must be None or 2), else stdlib json.
+        """
+        if orjson is not None and indent in (None, 2):
+            option = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+            if indent:
+                option |= orjson.OPT_INDENT_2
+            encode = functools.partial(orjson.dumps, option=option)
+        else:
+            std_encode = json.JSONEncoder(ensure_ascii=False, indent=indent).encode
+            encode = lambda feat: std_encode(feat).encode("utf-8")
+
+        with open(path, "wb") as f:
+            f.write(b'{"type": "FeatureCollection", "features": [\n')
+            first = True
+            for feat in self.iter_features():
+                if not first:
+                    f.write(b",\n")
+                f.write(encode(feat))
+                first = False
+            f.write(b"\n]}\n")
 
     # -------------------- internals --------------------
 
@@ -97,73 +188,197 @@ class DataFrameToGeoJSON:
             if c and c not in self.df.columns:
                 raise ValueError(f"Column '{c}' not found in DataFrame.")
 
-    def _build_geometry(self, rec: Dict[str, Any]) -> Optional[GeometryLike]:
+    def _assemble(self, rows: Sequence[int], geoms: Sequence[GeometryLike]) -> Iterator[Dict[str, Any]]:
+        """Attach properties/id (by row position) to already-built geometries."""
+        prop_cols = self._prop_cols
+        prop_lists = [self._json_list(self.df[c]) for c in prop_cols]
+        ids = self._json_list(self.df[self.id_col]) if self.id_col else None
+
+        for i, geom in zip(rows, geoms):
+            feat: Dict[str, Any] = {
+                "type": "Feature",
+                "geometry": geom,
+                "properties": {c: v for c, vals in zip(prop_cols, prop_lists) if (v := vals[i]) is not None},
+            }
+            if ids is not None and ids[i] is not None:
+                feat["id"] = ids[i]
+            yield feat
+
+    def _raise_for_row(self, i: int) -> None:
+        raise ValueError("Geometry could not be constructed for row: %r" % self.df.iloc[i].to_dict())
+
+    def _latlon_geometries(self) -> Tuple[List[int], List[GeometryLike]]:
         """
-        Return a GeoJSON geometry dict or None.
-        Accepted inputs:
-          - lat/lon numeric columns -> Point
-          - geometry_col as:
-              * GeoJSON-like dict with 'type' and 'coordinates'
-              * [lon, lat] or (lon, lat)
-              * WKT 'POINT (lon lat)'
+        Build Point geometries from lat/lon columns with whole-column NumPy ops
+        (coercion, NaN/WGS84-range mask and rounding) instead of per-row dicts and round().
         """
-        if self.geometry_col:
-            raw = rec.get(self.geometry_col, None)
-            if pd.isna(raw):
+        lat = pd.to_numeric(self.df[self.lat_col], errors="coerce").to_numpy(dtype=np.float64)
+        lon = pd.to_numeric(self.df[self.lon_col], errors="coerce").to_numpy(dtype=np.float64)
+        coords, valid = self._finalize_points(lon, lat)
+        if not self.dropna and not valid.all():
+            self._raise_for_row(int(np.flatnonzero(~valid)[0]))
+
+        rows = np.flatnonzero(valid).tolist()
+        geoms = [{"type": "Point", "coordinates": c} for c in coords[valid].tolist()]
+        return rows, geoms
+
+    def _finalize_points(self, lon: np.ndarray, lat: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        if self.precision is None:
+            return np.column_stack((lon, lat)), _wgs84_mask(lon, lat)
+        return _finalize_points(lon, lat, self.precision)
+
+    def _column_geometries(self) -> Tuple[List[int], List[GeometryLike]]:
+        """Build geometries from geometry_col with the representation-specific builder."""
+        geom_fn = self._geom_fn
+        prebuilt = self._wkt_geometries() if geom_fn == self._geom_from_wkt else None
+        col = self.df[self.geometry_col]
+        present = col.notna().to_numpy().tolist()  # one vectorized pass, not pd.isna per row
+        rows: List[int] = []
+        geoms: List[GeometryLike] = []
+        for i, raw in enumerate(col.tolist()):
+            geom = prebuilt[i] if prebuilt is not None else None
+            try:
+                if geom is None and present[i]:
+                    geom = geom_fn(raw)
+            except ValueError:
+                if self.dropna:
+                    continue
+                raise
+            if geom is None:
+                if self.dropna:
+                    continue
+                self._raise_for_row(i)
+            rows.append(i)
+            geoms.append(geom)
+        return rows, geoms
+
+    def _wkt_geometries(self) -> List[Optional[GeometryLike]]:
+        """
+        Parse a WKT geometry_col for the whole frame at once: POINTs via a
+        vectorized str.extract + np.round, other WKT via shapely.from_wkt (if
+        installed). Rows left as None go through the per-row builder.
+        """
+        col = self.df[self.geometry_col]
+        out: List[Optional[GeometryLike]] = [None] * len(col)
+
+        parsed = col.str.extract(_POINT_WKT_RE)
+        lon = pd.to_numeric(parsed["lon"], errors="coerce").to_numpy(dtype=np.float64)
+        lat = pd.to_numeric(parsed["lat"], errors="coerce").to_numpy(dtype=np.float64)
+        matched = ~(np.isnan(lon) | np.isnan(lat))
+        coords, points = self._finalize_points(lon, lat)
+        for i, c in zip(np.flatnonzero(points).tolist(), coords[points].tolist()):
+            out[i] = {"type": "Point", "coordinates": c}
+
+        if shapely is not None:
+            rest = np.flatnonzero(~matched & (col.map(type).to_numpy() == str))
+            if rest.size:
+                parsed_geoms = shapely.from_wkt(col.to_numpy()[rest], on_invalid="ignore")
+                for i, g in zip(rest.tolist(), parsed_geoms):
+                    if g is None or g.is_empty or g.geom_type == "GeometryCollection":
+                        continue
+                    out[i] = self._round_geometry(shapely.geometry.mapping(g))
+        return out
+
+    def _select_geom_fn(self) -> Callable[[Any], Optional[GeometryLike]]:
+        """
+        Pick the geometry builder once from the first non-null value, so the
+        per-row loop skips the isinstance chain for homogeneous columns.
+        Values of another representation still fall back to _geom_from_any.
+        """
+        sample = self.df[self.geometry_col].dropna()
+        if sample.empty:
+            return self._geom_from_any
+        first = sample.iloc[0]
+        if isinstance(first, dict):
+            return self._geom_from_dict
+        if isinstance(first, (list, tuple)):
+            return self._geom_from_pair
+        if isinstance(first, str):
+            return self._geom_from_wkt
+        return self._geom_from_any
+
+    def _geom_from_dict(self, raw: Any) -> Optional[GeometryLike]:
+        """GeoJSON-like dict with 'type' and 'coordinates' (passed through as-is when precision is None)."""
+        if isinstance(raw, dict) and "type" in raw and "coordinates" in raw:
+            if self.precision is None:
+                return raw
+            return self._round_geometry(raw)
+        return self._geom_from_any(raw)
+
+    def _geom_from_pair(self, raw: Any) -> Optional[GeometryLike]:
+        """[lon, lat] or (lon, lat)."""
+        if isinstance(raw, (list, tuple)) and len(raw) == 2:
+            lon, lat = self._to_float(raw[0]), self._to_float(raw[1])
+            if lon is None or lat is None or not _in_wgs84(lon, lat):
                 return None
-            # Case 1: already a GeoJSON-like dict
-            if isinstance(raw, dict) and "type" in raw and "coordinates" in raw:
-                return self._round_geometry(raw)
-
-            # Case 2: pair-like [lon, lat]
-            if isinstance(raw, (list, tuple)) and len(raw) == 2:
-                lon, lat = raw[0], raw[1]
-                lon, lat = self._to_float(lon), self._to_float(lat)
-                if lon is None or lat is None:
+            return {"type": "Point", "coordinates": self._round_coord([lon, lat])}
+        return self._geom_from_any(raw)
+
+    def _geom_from_wkt(self, raw: Any) -> Optional[GeometryLike]:
+        """Minimal WKT 'POINT (lon lat)'."""
+        if isinstance(raw, str):
+            pt = _parse_point_wkt(raw)
+            if pt is not None:
+                lon, lat = pt
+                if not _in_wgs84(lon, lat):
                     return None
                 return {"type": "Point", "coordinates": self._round_coord([lon, lat])}
+        return self._geom_from_any(raw)
 
-            # Case 3: minimal WKT POINT
-            if isinstance(raw, str):
-                m = _POINT_WKT_RE.match(raw)
-                if m:
-                    lon = float(m.group("lon"))
-                    lat = float(m.group("lat"))
-                    return {"type": "Point", "coordinates": self._round_coord([lon, lat])}
-
-            # Unknown geometry format
-            raise ValueError(
-                f"Unsupported geometry format in '{self.geometry_col}': {type(raw).__name__}"
-            )
-
-        # Build from lat/lon
-        lat = self._to_float(rec.get(self.lat_col))
-        lon = self._to_float(rec.get(self.lon_col))
-        if lat is None or lon is None:
-            return None
-        return {"type": "Point", "coordinates": self._round_coord([lon, lat])}
-
-    def _build_properties(self, rec: Dict[str, Any]) -> Dict[str, Any]:
-        if self.properties is not None:
-            prop_cols: Iterable[str] = self.properties
+    def _geom_from_any(self, raw: Any) -> Optional[GeometryLike]:
+        """
+        Return a GeoJSON geometry dict for any supported geometry_col value:
+          * GeoJSON-like dict with 'type' and 'coordinates'
+          * [lon, lat] or (lon, lat)
+          * WKT 'POINT (lon lat)'
+        """
+        if isinstance(raw, dict) and "type" in raw and "coordinates" in raw:
+            return self._geom_from_dict(raw)
+        if isinstance(raw, (list, tuple)) and len(raw) == 2:
+            return self._geom_from_pair(raw)
+        if isinstance(raw, str) and _parse_point_wkt(raw) is not None:
+            return self._geom_from_wkt(raw)
+
+        # Unknown geometry format
+        raise ValueError(
+            f"Unsupported geometry format in '{self.geometry_col}': {type(raw).__name__}"
+        )
+
+    @classmethod
+    def _json_list(cls, s: pd.Series) -> List[Any]:
+        """
+        Convert a whole column to JSON-safe Python values (None for missing),
+        choosing the conversion once from the dtype instead of per cell.
+        """
+        if pd.api.types.is_datetime64_any_dtype(s):
+            if getattr(s.dt, "tz", None) is None and not (s.dt.nanosecond != 0).any():
+                # str(Timestamp) per value: ".ffffff" only when the value has microseconds
+                # (Series.astype(str) pads every value to the column's finest precision)
+                vals = s.dt.strftime("%Y-%m-%d %H:%M:%S").where(
+                    s.dt.microsecond == 0, s.dt.strftime("%Y-%m-%d %H:%M:%S.%f"))
+            else:
+                vals = s.map(str)
+        elif pd.api.types.is_timedelta64_dtype(s):
+            vals = s.astype(str)
         else:
-            prop_cols = [c for c in rec.keys() if c not in self._excluded_cols]
-
-        props = {}
-        for c in prop_cols:
-            val = rec.get(c)
-            # Convert pandas types to plain Python/JSON
-            if pd.isna(val):
-                continue
-            if isinstance(val, (pd.Timestamp, pd.Timedelta)):
-                val = str(val)
-            elif hasattr(val, "item"):  # numpy scalar
-                try:
-                    val = val.item()
-                except Exception:
-                    val = str(val)
-            props[c] = val
-        return props
+            vals = s
+        out = vals.astype(object).where(s.notna(), None).tolist()
+        if s.dtype == object:
+            # object columns may still carry NumPy/pandas scalars
+            out = [v if v is None or type(v) in _JSON_NATIVE else cls._json_value(v) for v in out]
+        return out
+
+    @staticmethod
+    def _json_value(val: Any) -> Any:
+        """Convert pandas/NumPy scalars to plain Python/JSON values."""
+        if isinstance(val, (pd.Timestamp, pd.Timedelta)):
+            return str(val)
+        if hasattr(val, "item"):  # numpy scalar
+            try:
+                return val.item()
+            except Exception:
+                return str(val)
+        return val
 
     def _to_float(self, v: Any) -> Optional[float]:
         if v is None or (isinstance(v, float) and pd.isna(v)):
@@ -174,12 +389,19 @@ class DataFrameToGeoJSON:
             return None
 
     def _round_coord(self, coord: Sequence[float]) -> List[float]:
+        if self.precision is None:
+            return [float(c) for c in coord]
         return [round(float(c), self.precision) for c in coord]
 
     def _round_geometry(self, geom: GeometryLike) -> GeometryLike:
         """
-        Round coordinates recursively; supports Point/LineString/Polygon/Multi*.
+        Round coordinates; supports Point/LineString/Polygon/Multi*.
+        Each run of positions is rounded as one NumPy array.
+        Returned unchanged when precision is None.
         """
+        if self.precision is None:
+            return geom
+
         def round_coords(obj: Any) -> Any:
             if isinstance(obj, (list, tuple)):
                 if obj and isinstance(obj[0], (int, float)):  # a single coordinate pair
@@ -187,11 +409,23 @@ class DataFrameToGeoJSON:
                 return [round_coords(x) for x in obj]
             return obj
 
+        def round_positions(obj: Any, nesting: int) -> Any:
+            if nesting > 1:
+                return [round_positions(x, nesting - 1) for x in obj]
+            try:
+                arr = np.asarray(obj, dtype=np.float64)
+            except (TypeError, ValueError):  # ragged / mixed 2D-3D positions
+                return round_coords(obj)
+            return np.round(arr, self.precision, out=arr).tolist()
+
         gtype = geom.get("type")
         coords = geom.get("coordinates")
         if gtype is None or coords is None:
             raise ValueError("Invalid GeoJSON geometry: missing 'type' or 'coordinates'")
-        return {"type": gtype, "coordinates": round_coords(coords)}
+        nesting = _COORD_NESTING.get(gtype)
+        if nesting is None:
+            return {"type": gtype, "coordinates": round_coords(coords)}
+        return {"type": gtype, "coordinates": round_positions(coords, nesting)}
 
 
 # -------------------- example usage --------------------
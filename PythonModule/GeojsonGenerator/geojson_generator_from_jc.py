@@ -1,5 +1,8 @@
+import io
+import os
+from concurrent.futures import ProcessPoolExecutor
+
 import psycopg2
-import json
 
 # Your existing code for tables_and_outputs, generate_geojson, and other configurations
 #Local Creds : Host=localhost;dbname=drx_fpl_test;user=postgres;password=root;
@@ -18,11 +21,39 @@ tables_and_outputs = [
     # Add more tables and output file names as needed
 ]
 
+class ProgressWriter(io.BufferedIOBase):
+    """
+    Binary file wrapper for copy_expert: passes COPY bytes through to the file
+    and prints progress every `every` rows (one row per line).
+    """
+
+    def __init__(self, f, total_rows, every):
+        super().__init__()
+        self._f = f
+        self._total_rows = total_rows
+        self._every = max(every, 1)
+        self.rows = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self._f.write(data)
+        before = self.rows
+        self.rows += data.count(b'\n')
+        if self.rows // self._every != before // self._every:
+            # Report progress (approximate percentage when an estimate exists)
+            if self._total_rows:
+                percentage = min((self.rows / self._total_rows) * 100, 100)
+                print(f'Progress: ~{percentage:.2f}% ({self.rows} rows)', end='\r')
+            else:
+                print(f'Progress: {self.rows} rows', end='\r')
+        return len(data)
+
 def generate_geojson(table_name, output_file, filter=None, columns=None , order_by = None):
 #def generate_geojson(table_name, output_file):
     conn = None
-    batch_size = 100000  # Adjust the batch size as needed
-    offset = 0
+    batch_size = 100000  # Rows between progress updates
     try:
         # Connect to the PostgreSQL server
         print(f'Connecting to the PostgreSQL database...')
@@ -38,37 +69,36 @@ def generate_geojson(table_name, output_file, filter=None, columns=None , order_
         cur = conn.cursor()
         print(f'Connected to the PostgreSQL database')
 
-        # Get the total count of rows for the given table
-        #cur.execute(f'SELECT COUNT(*) FROM ev.tblcircuits')
-        # cur.execute(f'SELECT COUNT(*) FROM "ugcables"."{table_name}" {filter}')
-        cur.execute(f'SELECT COUNT(*) FROM "ugcables"."{table_name}" {filter}')
-        total_rows = cur.fetchone()[0]
-
-        # Create an empty list to store GeoJSON features
-        geojson_features = []
-
-        while offset < total_rows:
-            # Construct the query to fetch the rows for the given batch
-            cur.execute(f'''
-                SELECT {columns}, ST_AsGeoJSON(t.*)::json AS geojson
-                FROM "ugcables"."{table_name}" t {filter}
-                ORDER BY {order_by} OFFSET {offset} LIMIT {batch_size}
-            ''')
-
-
-            # Fetch the rows (as a list of tuples)
-            rows = cur.fetchall()
-
-            # Process the rows and add them to the list of GeoJSON features
-            for row in rows:
-                geojson_features.append(row[-1])  # The last element is the GeoJSON
-
-            # Move to the next batch
-            offset += batch_size
+        # Estimate the row count from planner statistics instead of a COUNT(*) scan.
+        # Views, never-analyzed tables (-1) and filtered exports get no estimate,
+        # so progress falls back to a plain rows-written counter.
+        total_rows = 0
+        if not filter:
+            cur.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                        (f'"ugcables"."{table_name}"',))
+            total_rows = max(cur.fetchone()[0], 0)
+
+        # Stream the Features with COPY ... TO STDOUT: PostgreSQL renders each one
+        # as JSON text (prefixed with its ',' separator) and the bytes go straight
+        # to the file -- no per-row fetch, tuple or str objects in Python.
+        # CSV format with unused QUOTE/DELIMITER bytes keeps the JSON verbatim
+        # (text format would escape backslashes). The ::jsonb round trip re-serializes
+        # json-typed columns on one line: a raw newline would make COPY quote the row.
+        conn.set_client_encoding('UTF8')
+        with open(output_file, 'wb') as f:
+            f.write(b'{"type": "FeatureCollection", "features": [\n')
+            cur.copy_expert(f'''
+                COPY (
+                    SELECT CASE WHEN row_number() OVER () = 1 THEN '' ELSE ',' END || q.geojson
+                    FROM (
+                        SELECT ST_AsGeoJSON(t.*)::jsonb::text AS geojson
+                        FROM "ugcables"."{table_name}" t {filter}
+                        ORDER BY {order_by}
+                    ) q
+                ) TO STDOUT WITH (FORMAT csv, QUOTE E'\\x01', DELIMITER E'\\x02')
+            ''', ProgressWriter(f, total_rows, batch_size))
+            f.write(b']}\n')
 
-            # Calculate the percentage completed
-            percentage = min((offset / total_rows) * 100, 100)
-            print(f'Progress: {percentage:.2f}%', end='\r')
         # Close the cursor
         cur.close()
 
@@ -77,25 +107,28 @@ def generate_geojson(table_name, output_file, filter=None, columns=None , order_
     finally:
         if conn is not None:
             conn.close()
-            print('Database connection closed.')
-
-    # Write the final FeatureCollection to the output file
-    with open(output_file, 'w') as f:
-        f.write(json.dumps({
-        'type': 'FeatureCollection',
-        'features': geojson_features
-    }, indent=2))
-
-print('GeoJSON generation inprogress.')
-# Loop through the array and generate GeoJSON for each table with its custom filter (if provided)
-for entry in tables_and_outputs:
-    table_name = entry['table']
-    output_file = entry['output']
-    filters = entry['filter'] if 'filter' in entry else None
-    columns = entry['columns'] if 'columns' in entry else '*'
-    order_by = entry['order_by'] if 'order_by' in entry else 'fid'
-    generate_geojson(table_name, output_file, filters, columns,order_by)
-    # generate_geojson(table_name, output_file)
-
-# Process finished indicator
-print('GeoJSON generation process finished.')
\ No newline at end of file
+            print(f'Database connection closed ({table_name}).')
+
+if __name__ == '__main__':
+    print('GeoJSON generation inprogress.')
+    # Generate GeoJSON for each table with its custom filter (if provided).
+    # Tables are independent, so each one runs in its own worker process with
+    # its own connection; the __main__ guard keeps spawned workers from
+    # re-running this block on import.
+    with ProcessPoolExecutor(max_workers=max(1, min(len(tables_and_outputs), os.cpu_count() or 1, 4))) as executor:
+        futures = [
+            executor.submit(
+                generate_geojson,
+                entry['table'],
+                entry['output'],
+                entry.get('filter', ''),
+                entry.get('columns', '*'),
+                entry.get('order_by', 'fid'),
+            )
+            for entry in tables_and_outputs
+        ]
+        for future in futures:
+            future.result()
+
+    # Process finished indicator
+    print('GeoJSON generation process finished.')
@@ -16,6 +16,8 @@ Usage example:
 """
 
 from __future__ import annotations
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
 from typing import Iterable, List, Optional, Union
 
@@ -28,7 +30,7 @@ class PostgresSqlDeployer:
     Deploy a SQL file/string to multiple PostgreSQL databases on one server.
 
     - Enumerates non-template DBs (excludes template0/template1; also excludes 'postgres' by default)
-    - Executes within a transaction per database
+    - Executes within a transaction per database, several databases in parallel
     - Optional include/exclude filters
     - Optional dry-run and statement timeout
     """
@@ -41,6 +43,7 @@ class PostgresSqlDeployer:
         password: str = "",
         sslmode: Optional[str] = None,
         default_exclude: Optional[Iterable[str]] = None,
+        max_parallel: int = 8,
     ) -> None:
         self.host = host
         self.port = port
@@ -49,6 +52,9 @@ class PostgresSqlDeployer:
         self.sslmode = sslmode
         # Always exclude 'postgres' unless explicitly included
         self.default_exclude = set(default_exclude or []) | {"postgres"}
+        self._default_exclude_fs = frozenset(self.default_exclude)
+        # Databases deployed concurrently (one connection/thread each)
+        self.max_parallel = max(1, int(max_parallel))
 
     # ---- Public API ---------------------------------------------------------
 
@@ -90,18 +96,30 @@ class PostgresSqlDeployer:
             return
 
         self._log(f"Target DBs: {', '.join(targets)}")
-        for db in targets:
-            try:
-                self._run_sql_on_db(
+        # Databases are independent; overlap their round-trips on a thread pool
+        # (psycopg releases the GIL while waiting on the network).
+        with ThreadPoolExecutor(max_workers=min(self.max_parallel, len(targets))) as ex:
+            fut_to_db = {
+                ex.submit(
+                    self._run_sql_on_db,
                     dbname=db,
                     sql_text=sql_text,
                     statement_timeout_ms=statement_timeout_ms,
                     dry_run=dry_run,
-                )
-            except Exception as e:
-                self._err(f"[{db}] ERROR: {e}")
-                if not continue_on_error:
-                    raise
+                ): db
+                for db in targets
+            }
+            for fut in as_completed(fut_to_db):
+                db = fut_to_db[fut]
+                try:
+                    fut.result()
+                except Exception as e:
+                    self._err(f"[{db}] ERROR: {e}")
+                    if not continue_on_error:
+                        # Databases not yet started are skipped; in-flight ones finish
+                        for pending in fut_to_db:
+                            pending.cancel()
+                        raise
 
     def list_databases(self) -> List[str]:
         """Return all non-template databases on the server."""
@@ -137,7 +155,13 @@ class PostgresSqlDeployer:
         p = Path(path)  # normalize to Path
         if not p.exists():
             raise FileNotFoundError(f"SQL file not found: {p}")
-        return p.read_text(encoding="utf-8")
+        # Keyed on mtime so an edited file is re-read
+        return self._read_sql_cached(str(p.resolve()), p.stat().st_mtime_ns)
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _read_sql_cached(path_str: str, mtime_ns: int) -> str:
+        return Path(path_str).read_text(encoding="utf-8")
 
     def _filter_databases(
         self,
@@ -145,13 +169,10 @@ class PostgresSqlDeployer:
         include: Optional[Iterable[str]],
         exclude: Optional[Iterable[str]],
     ) -> List[str]:
-        s = set(all_dbs)
-        s -= self.default_exclude
-        if exclude:
-            s -= set(exclude)
-        if include:
-            s &= set(include)
-        return sorted(s)
+        # Single pass that keeps list_databases()' ORDER BY datname order
+        excl = self._default_exclude_fs | frozenset(exclude or ())
+        incl = frozenset(include) if include else None
+        return [d for d in all_dbs if d not in excl and (incl is None or d in incl)]
 
     def _run_sql_on_db(
         self,
@@ -165,15 +186,20 @@ class PostgresSqlDeployer:
             self._log(f"    [dry-run] would execute SQL ({len(sql_text)} chars)")
             return
 
+        prelude = ""
+        if statement_timeout_ms is not None:
+            prelude = (
+                f"SET LOCAL statement_timeout = {int(statement_timeout_ms)};\n"
+                "SET LOCAL lock_timeout = 1000;\n"  # 1s lock timeout guard
+            )
+
         with self._connect(dbname) as conn:
-            # Transaction per database
+            # Transaction per database. The timeouts travel in the same
+            # (parameterless, simple-protocol) message as the script, so the
+            # whole body costs one round-trip.
             with conn.transaction():
-                if statement_timeout_ms is not None:
-                    with conn.cursor() as cur:
-                        cur.execute(f"SET LOCAL statement_timeout = {int(statement_timeout_ms)};")
-                        cur.execute("SET LOCAL lock_timeout = 1000;")  # 1s lock timeout guard
                 with conn.cursor() as cur:
-                    cur.execute(sql_text)
+                    cur.execute(prelude + sql_text)
 
         self._log(f"==> [{dbname}] done")
 
@@ -202,6 +228,7 @@ if __name__ == "__main__":
         p.add_argument("--exclude", nargs="*", help="DBs to exclude (space-separated). 'postgres' excluded by default.")
         p.add_argument("--continue-on-error", action="store_true", help="Continue to next DB if one fails.")
         p.add_argument("--statement-timeout-ms", type=int, default=None, help="Optional statement_timeout in ms.")
+        p.add_argument("--max-parallel", type=int, default=8, help="Databases deployed concurrently.")
         p.add_argument("--dry-run", action="store_true", help="Don’t execute, only show what would happen.")
         return p.parse_args()
 
@@ -214,6 +241,7 @@ if __name__ == "__main__":
             user=args.user,
             password=args.password,
             sslmode=args.sslmode,
+            max_parallel=args.max_parallel,
         )
         deployer.deploy_file(
             sql_path=args.sql,
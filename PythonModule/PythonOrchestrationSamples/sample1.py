@@ -12,14 +12,20 @@ Requires: psycopg2-binary, pandas
 """
 
 from __future__ import annotations
+import io
 import os
+import random
 import time
 import logging
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import psycopg2
 import psycopg2.extras
+import psycopg2.pool
+import numpy as np
 import pandas as pd
 
 # -----------------------------
@@ -43,6 +49,7 @@ class DBConfig:
     idle_in_tx_session_timeout_ms: int = 120_000
     isolation_level: str = "READ COMMITTED"  # or "REPEATABLE READ"
     autocommit: bool = False
+    maxconn: int = 4  # pooled connections shared across steps
 
     @staticmethod
     def from_env(prefix: str = "PG") -> "DBConfig":
@@ -63,31 +70,143 @@ class DBConfig:
             idle_in_tx_session_timeout_ms=int(os.getenv("PG_IDLE_TX_TIMEOUT_MS", "120000")),
             isolation_level=os.getenv("PG_ISOLATION", "READ COMMITTED"),
             autocommit=False,
+            maxconn=int(os.getenv("PG_POOL_MAXCONN", "4")),
         )
 
 # -----------------------------
 # DB client
 # -----------------------------
+# psycopg2 result type OID -> pandas dtype used by select_df (other types are inferred)
+_PG_DTYPES = {
+    16: "boolean",                          # bool
+    20: "Int64", 21: "Int64", 23: "Int64",  # int8 / int2 / int4
+    700: "Float64", 701: "Float64",         # float4 / float8
+    1700: "Float64",                        # numeric (as read_sql's coerce_float)
+    25: "string", 1043: "string",           # text / varchar
+    1114: "datetime64[ns]",                 # timestamp
+}
+
+# Binary-COPY select_df path: type OID -> (cast used in the COPY query, NULL stand-in, wire dtype).
+# Every column is cast to a fixed-width type and NULLs are replaced + flagged, so each
+# COPY tuple has the same size and the whole result decodes with one np.frombuffer.
+_BINARY_COLS = {
+    16: ("bool", "false", "?"),
+    20: ("int8", "0", ">i8"), 21: ("int8", "0", ">i8"), 23: ("int8", "0", ">i8"),
+    700: ("float8", "0", ">f8"), 701: ("float8", "0", ">f8"),
+    1114: ("timestamp", "'2000-01-01'", ">i8"),  # microseconds since 2000-01-01
+}
+_PG_EPOCH = np.datetime64("2000-01-01T00:00:00", "us")
+
 class PostgresClient:
     def __init__(self, cfg: DBConfig):
         self.cfg = cfg
+        # Connections are reused across steps; session settings are applied once per connection
+        self._pool = psycopg2.pool.ThreadedConnectionPool(minconn=1, maxconn=cfg.maxconn, dsn=cfg.dsn)
+        # Connections already set up by _init_session (tracked here, not via application_name,
+        # which the DSN itself may set); closed connections drop out as they are collected
+        self._initialized: weakref.WeakSet = weakref.WeakSet()
+        # (procedure, arg count) -> composed CALL statement
+        self._call_sql: Dict[Tuple[str, int], str] = {}
 
     def connect(self):
-        conn = psycopg2.connect(self.cfg.dsn)
+        conn = self._pool.getconn()
         conn.autocommit = self.cfg.autocommit
-        # session setup
-        with conn.cursor() as cur:
-            cur.execute("SET application_name = %s", (self.cfg.application_name,))
-            cur.execute("SET statement_timeout = %s", (self.cfg.statement_timeout_ms,))
-            cur.execute("SET lock_timeout = %s", (self.cfg.lock_timeout_ms,))
-            cur.execute("SET idle_in_transaction_session_timeout = %s", (self.cfg.idle_in_tx_session_timeout_ms,))
-            cur.execute(f"SET SESSION CHARACTERISTICS AS TRANSACTION ISOLATION LEVEL {self.cfg.isolation_level}")
+        if conn not in self._initialized:
+            self._init_session(conn)
+            self._initialized.add(conn)
         return conn
 
+    def release(self, conn):
+        """Return a connection obtained from connect() to the pool."""
+        self._pool.putconn(conn, close=bool(conn.closed))
+
+    def close(self):
+        self._pool.closeall()
+
+    def _init_session(self, conn):
+        # session setup in one round-trip (committed so a rolled-back first step doesn't undo it)
+        with conn.cursor() as cur:
+            cur.execute(
+                "SELECT set_config('application_name', %s, false),"
+                " set_config('statement_timeout', %s, false),"
+                " set_config('lock_timeout', %s, false),"
+                " set_config('idle_in_transaction_session_timeout', %s, false),"
+                " set_config('default_transaction_isolation', %s, false)",
+                (
+                    self.cfg.application_name,
+                    str(self.cfg.statement_timeout_ms),
+                    str(self.cfg.lock_timeout_ms),
+                    str(self.cfg.idle_in_tx_session_timeout_ms),
+                    self.cfg.isolation_level.lower(),
+                ),
+            )
+        if not conn.autocommit:
+            conn.commit()
+
     # ----------- SELECT -> DataFrame (in current tx) -----------
-    def select_df(self, conn, sql: str, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
-        # Uses the same connection/transaction boundary as your SP calls
-        return pd.read_sql_query(sql, conn, params=params)
+    def select_df(self, conn, sql: str, params: Optional[Sequence[Any]] = None, binary: bool = False) -> pd.DataFrame:
+        # Uses the same connection/transaction boundary as your SP calls.
+        # Rows are pivoted straight into typed column arrays (no read_sql_query
+        # intermediate copies); dtypes come from the result's type OIDs.
+        # binary=True decodes numeric/timestamp results columnar (see select_df_binary).
+        if binary:
+            return self.select_df_binary(conn, sql, params)
+        with conn.cursor() as cur:
+            cur.execute(sql, params or ())
+            desc = cur.description
+            rows = cur.fetchall()
+        cols_data = list(zip(*rows)) if rows else [()] * len(desc)
+        frame = pd.DataFrame(dict(enumerate(pd.array(v, dtype=_PG_DTYPES.get(d.type_code))
+                                              for d, v in zip(desc, cols_data))))
+        frame.columns = [d.name for d in desc]  # positional keys: duplicate names keep both columns
+        return frame
+
+    def select_df_binary(self, conn, sql: str, params: Optional[Sequence[Any]] = None) -> pd.DataFrame:
+        """
+        select_df for large numeric/timestamp/bool results: the rows come back through
+        COPY ... (FORMAT BINARY) and each column is sliced out of the raw buffer with
+        np.frombuffer instead of being parsed and boxed cell by cell.
+        Falls back to select_df when a column type isn't in _BINARY_COLS
+        (costs one extra LIMIT 0 round-trip to learn the column types).
+        """
+        with conn.cursor() as cur:
+            # Wrapped as a subquery below, so a trailing ';' (fine for select_df) must go
+            query = cur.mogrify(sql, params or ()).decode().rstrip(" \t\r\n\f\v;")
+            cur.execute(f"SELECT * FROM ({query}) q LIMIT 0")
+            desc = cur.description
+        names = [d.name for d in desc]
+        if len(set(names)) != len(names) or any(d.type_code not in _BINARY_COLS for d in desc):
+            return self.select_df(conn, sql, params)
+
+        select_list = []
+        row_dtype = [("nfields", ">i2")]
+        for j, d in enumerate(desc):
+            cast, stand_in, wire = _BINARY_COLS[d.type_code]
+            col = '"' + d.name.replace('"', '""') + '"'
+            select_list.append(f"coalesce({col}::{cast}, {stand_in}::{cast}), {col} IS NULL")
+            row_dtype += [(f"len{j}", ">i4"), (f"val{j}", wire), (f"nlen{j}", ">i4"), (f"null{j}", "?")]
+
+        buf = io.BytesIO()
+        with conn.cursor() as cur:
+            cur.copy_expert(f"COPY (SELECT {', '.join(select_list)} FROM ({query}) q) TO STDOUT WITH (FORMAT BINARY)", buf)
+        raw = buf.getbuffer()
+        # 19-byte header (signature + flags + extension length), 2-byte trailer
+        rows = np.frombuffer(raw, dtype=row_dtype, offset=19, count=(len(raw) - 21) // np.dtype(row_dtype).itemsize)
+
+        data = {}
+        for j, d in enumerate(desc):
+            vals, nulls = rows[f"val{j}"], rows[f"null{j}"].copy()
+            if d.type_code == 1114:
+                ts = _PG_EPOCH + vals.astype("i8").astype("timedelta64[us]")
+                ts[nulls] = np.datetime64("NaT")
+                data[d.name] = ts.astype(_PG_DTYPES[1114])
+            elif d.type_code == 16:
+                data[d.name] = pd.arrays.BooleanArray(vals.copy(), nulls)
+            elif d.type_code in (700, 701):
+                data[d.name] = pd.arrays.FloatingArray(vals.astype(np.float64), nulls)
+            else:
+                data[d.name] = pd.arrays.IntegerArray(vals.astype(np.int64), nulls)
+        return pd.DataFrame(data)
 
     # ----------- Streaming SELECT (server-side cursor) ----------
     def stream_select_df(
@@ -97,11 +216,37 @@ class PostgresClient:
         params: Optional[Sequence[Any]] = None,
         fetch_size: int = 5_000,
         cursor_name: str = "stream_cursor",
+        itersize: int = 50_000,
     ) -> Iterable[pd.DataFrame]:
         """
-        Yields DataFrames in chunks using a server-side cursor.
+        Yields DataFrames of up to fetch_size rows using a server-side cursor.
+        Rows are pulled in FETCH FORWARD blocks of max(fetch_size, itersize) from
+        a NO SCROLL cursor, so small chunks don't cost a round-trip each.
         """
-        with conn.cursor(name=cursor_name) as cur:
+        with conn.cursor(name=cursor_name, scrollable=False) as cur:
+            cur.itersize = max(fetch_size, itersize)
+            cur.execute(sql, params or ())
+            cols = [d.name for d in cur.description]
+            while True:
+                rows = cur.fetchmany(cur.itersize)
+                if not rows:
+                    break
+                for i in range(0, len(rows), fetch_size):
+                    yield pd.DataFrame(rows[i:i + fetch_size], columns=cols)
+
+    def stream_select_columns(
+        self,
+        conn,
+        sql: str,
+        params: Optional[Sequence[Any]] = None,
+        fetch_size: int = 50_000,
+        cursor_name: str = "stream_cursor",
+    ) -> Iterable[Tuple[List[str], List[Tuple[Any, ...]]]]:
+        """
+        Like stream_select_df but yields (column_names, rows) straight from fetchmany,
+        for aggregates that don't need a DataFrame per chunk.
+        """
+        with conn.cursor(name=cursor_name, scrollable=False) as cur:
             cur.itersize = fetch_size
             cur.execute(sql, params or ())
             cols = [d.name for d in cur.description]
@@ -109,7 +254,7 @@ class PostgresClient:
                 rows = cur.fetchmany(fetch_size)
                 if not rows:
                     break
-                yield pd.DataFrame(rows, columns=cols)
+                yield cols, rows
 
     # ----------- CALL stored procedure -----------
     def call_procedure(
@@ -123,14 +268,37 @@ class PostgresClient:
         CALL schema.proc(%s, %s, ...) optionally fetches the single OUT row.
         In Postgres, CALL with OUT params returns one row.
         """
+        sql = self._call_stmt(qualified_name, len(in_params) if in_params else 0)
         with conn.cursor() as cur:
-            placeholders = ", ".join(["%s"] * len(in_params)) if in_params else ""
-            sql = f"CALL {qualified_name}({placeholders})"
             cur.execute(sql, in_params or ())
             if expect_out_row:
                 return cur.fetchone()  # tuple of OUT params
         return None
 
+    def call_procedure_many(
+        self,
+        conn,
+        qualified_name: str,
+        rows: Sequence[Sequence[Any]],
+        page_size: int = 500,
+    ) -> None:
+        """
+        CALL the same procedure once per params tuple in rows, sending page_size
+        CALLs per round-trip (psycopg2.extras.execute_batch). OUT rows are discarded.
+        """
+        if not rows:
+            return
+        sql = self._call_stmt(qualified_name, len(rows[0]))
+        with conn.cursor() as cur:
+            psycopg2.extras.execute_batch(cur, sql, rows, page_size=page_size)
+
+    def _call_stmt(self, qualified_name: str, nargs: int) -> str:
+        key = (qualified_name, nargs)
+        sql = self._call_sql.get(key)
+        if sql is None:
+            sql = self._call_sql[key] = f"CALL {qualified_name}({', '.join(['%s'] * nargs)})"
+        return sql
+
 # -----------------------------
 # Retry policy & helpers
 # -----------------------------
@@ -143,20 +311,40 @@ TRANSIENT_SQLSTATES = {
     "08006", "08003", "08001",  # connection issues
 }
 
+# Conflicts that can be retried by rolling back to a savepoint on the same connection.
+# serialization_failure (40001) is left to the step-level retry: under REPEATABLE READ /
+# SERIALIZABLE the transaction snapshot is stale and only a new transaction can succeed.
+STATEMENT_RETRY_SQLSTATES = {
+    "40P01",  # deadlock_detected
+    "55P03",  # lock_not_available
+}
+
 def is_transient_sqlstate(pgcode: Optional[str]) -> bool:
     return pgcode in TRANSIENT_SQLSTATES
 
+# Jitter source: OS entropy, so separate processes don't retry in lockstep (and thread-safe)
+_retry_rng = random.SystemRandom()
+
 @dataclass
 class RetryPolicy:
     max_attempts: int = 3
     initial_backoff_s: float = 1.0
-    backoff_multiplier: float = 2.0
+    backoff_multiplier: float = 2.0  # upper bound of the next delay = previous delay * multiplier
     max_backoff_s: float = 15.0
+    statement_backoff_s: float = 0.05  # wait before a savepoint retry (lets the other tx finish)
 
-    def sleep(self, attempt: int):
-        delay = min(self.initial_backoff_s * (self.backoff_multiplier ** (attempt - 1)), self.max_backoff_s)
+    def sleep(self, attempt: int, prev_s: float = 0.0) -> float:
+        """
+        Decorrelated jitter: delay = min(cap, uniform(base, previous_delay * multiplier)).
+        The policy holds no state; the retry loop passes back the delay this returned.
+        """
+        if attempt <= 1 or not prev_s:
+            prev_s = self.initial_backoff_s
+        delay = min(self.max_backoff_s,
+                    _retry_rng.uniform(self.initial_backoff_s, prev_s * self.backoff_multiplier))
         log.warning("Retrying in %.1fs ...", delay)
         time.sleep(delay)
+        return delay
 
 # -----------------------------
 # Orchestration base
@@ -166,9 +354,9 @@ class Orchestrator:
     Extend this class to implement your own steps.
     Each step runs in its own transaction by default.
     """
-    def __init__(self, db: PostgresClient, retry: RetryPolicy = RetryPolicy()):
+    def __init__(self, db: PostgresClient, retry: Optional[RetryPolicy] = None):
         self.db = db
-        self.retry = retry
+        self.retry = retry or RetryPolicy()
 
     def run(self):
         """
@@ -176,9 +364,24 @@ class Orchestrator:
         """
         raise NotImplementedError
 
+    def _run_parallel(self, steps: Sequence[Tuple[Callable[[Any], None], str]], parallel: bool = True):
+        """
+        Run independent steps, each via _run_tx on its own pooled connection.
+        Use parallel=False for steps that depend on each other (e.g. shared temp tables).
+        """
+        if not parallel or len(steps) < 2:
+            for fn, label in steps:
+                self._run_tx(fn, label)
+            return
+        with ThreadPoolExecutor(max_workers=min(len(steps), self.db.cfg.maxconn)) as pool:
+            futures = [pool.submit(self._run_tx, fn, label) for fn, label in steps]
+            for f in futures:
+                f.result()  # re-raises the first failing step
+
     # Utility to run a function inside a tx with retries on transient errors
     def _run_tx(self, fn: Callable[[Any], None], label: str):
         attempt = 0
+        delay = 0.0  # previous backoff, local to this call (steps may run in parallel)
         while True:
             attempt += 1
             try:
@@ -189,15 +392,38 @@ class Orchestrator:
                     log.info("Step '%s' committed.", label)
                     return
                 finally:
-                    conn.close()
+                    self.db.release(conn)
             except psycopg2.Error as e:
                 log.error("Step '%s' failed (attempt %d). sqlstate=%s detail=%s",
                           label, attempt, getattr(e, "pgcode", None), str(e))
                 if attempt < self.retry.max_attempts and is_transient_sqlstate(getattr(e, "pgcode", None)):
-                    self.retry.sleep(attempt)
+                    delay = self.retry.sleep(attempt, delay)
                     continue
                 raise  # re-raise non-transient or exhausted retries
 
+    # Run fn(conn) under a savepoint; on a lock conflict roll back just that part and retry it
+    # on the same connection/transaction instead of redoing the whole step.
+    def _in_savepoint(self, conn, fn: Callable[[Any], Any], label: str):
+        attempt = 0
+        while True:
+            attempt += 1
+            with conn.cursor() as cur:
+                cur.execute("SAVEPOINT orchestrator_stmt")
+            try:
+                result = fn(conn)
+            except psycopg2.Error as e:
+                pgcode = getattr(e, "pgcode", None)
+                if attempt >= self.retry.max_attempts or pgcode not in STATEMENT_RETRY_SQLSTATES:
+                    raise  # the step-level retry in _run_tx takes over
+                with conn.cursor() as cur:
+                    cur.execute("ROLLBACK TO SAVEPOINT orchestrator_stmt")
+                log.warning("'%s' hit sqlstate=%s (attempt %d); retrying from savepoint.", label, pgcode, attempt)
+                time.sleep(self.retry.statement_backoff_s * attempt)
+                continue
+            with conn.cursor() as cur:
+                cur.execute("RELEASE SAVEPOINT orchestrator_stmt")
+            return result
+
 # -----------------------------
 # Example: Implement your pipeline
 # -----------------------------
@@ -209,41 +435,65 @@ class ExampleETL(Orchestrator):
     3) Optional streaming read
     """
 
-    def __init__(self, db: PostgresClient, since_ts: str, retry: RetryPolicy = RetryPolicy()):
+    def __init__(self, db: PostgresClient, since_ts: str, retry: Optional[RetryPolicy] = None,
+                 debug_rows: bool = False, parallel: bool = False):
         super().__init__(db, retry)
         self.since_ts = since_ts
+        self.debug_rows = debug_rows  # also pull the raw rows into a DataFrame in step 1
+        # Opt-in: both steps CALL write SPs (handle_failures/promote_batch, record_summary);
+        # run them concurrently only if those SPs don't depend on each other's order or locks
+        self.parallel = parallel
 
     def run(self):
-        self._run_tx(self._step_fetch_and_decide, "fetch_and_decide")
-        self._run_tx(self._step_stream_and_summarize, "stream_and_summarize")
+        self._run_parallel([
+            (self._step_fetch_and_decide, "fetch_and_decide"),
+            (self._step_stream_and_summarize, "stream_and_summarize"),
+        ], parallel=self.parallel)
 
-    # ---- Step 1: normal SELECT -> DataFrame, then CALL SPs conditionally
+    # ---- Step 1: aggregate in SQL (one row back), then CALL SPs conditionally
     def _step_fetch_and_decide(self, conn):
         sql = """
-            SELECT job_id, status, updated_at, value
+            SELECT COUNT(*), COUNT(*) FILTER (WHERE status = 'error'), AVG(value)
             FROM public.etl_inputs
             WHERE updated_at >= %s
         """
-        df = self.db.select_df(conn, sql, params=(self.since_ts,))
-        log.info("Fetched %d rows since %s", len(df), self.since_ts)
-
-        if df.empty:
+        with conn.cursor() as cur:
+            cur.execute(sql, (self.since_ts,))
+            n, errors, avg_value = cur.fetchone()
+        log.info("Matched %d rows since %s", n, self.since_ts)
+
+        if self.debug_rows:
+            df = self.db.select_df(conn, """
+                SELECT job_id, status, updated_at, value
+                FROM public.etl_inputs
+                WHERE updated_at >= %s
+            """, params=(self.since_ts,))
+            log.debug("Step 1 rows:\n%s", df)
+
+        if n == 0:
             log.info("No rows -> skipping SP calls.")
             return
 
-        # Example conditions
-        errors = (df["status"] == "error").sum()
-        avg_value = float(df["value"].mean())
+        # Example conditions (AVG is NULL when every value is NULL)
+        avg_value = float(avg_value) if avg_value is not None else float("nan")
 
         log.info("errors=%s avg_value=%.4f", errors, avg_value)
 
         # Branch to SP calls
         if errors > 10:
-            out = self.db.call_procedure(conn, "public.handle_failures", in_params=(self.since_ts,), expect_out_row=True)
+            out = self._in_savepoint(
+                conn,
+                lambda c: self.db.call_procedure(c, "public.handle_failures", in_params=(self.since_ts,), expect_out_row=True),
+                "handle_failures",
+            )
             log.info("handle_failures OUT=%s", out)
 
         if avg_value > 0.85:
-            out = self.db.call_procedure(conn, "public.promote_batch", in_params=(self.since_ts,), expect_out_row=True)
+            out = self._in_savepoint(
+                conn,
+                lambda c: self.db.call_procedure(c, "public.promote_batch", in_params=(self.since_ts,), expect_out_row=True),
+                "promote_batch",
+            )
             log.info("promote_batch OUT=%s", out)
 
         # If you want to *soft-fail* (i.e., abort commit) on a condition:
@@ -260,10 +510,12 @@ class ExampleETL(Orchestrator):
         """
         total = 0
         err_rows = 0
-        for chunk in self.db.stream_select_df(conn, stream_sql, params=(self.since_ts,), fetch_size=10_000):
-            total += len(chunk)
-            if not chunk.empty:
-                err_rows += int((chunk["status"] == "error").sum())
+        status_idx = None
+        for cols, rows in self.db.stream_select_columns(conn, stream_sql, params=(self.since_ts,), fetch_size=50_000):
+            if status_idx is None:
+                status_idx = cols.index("status")
+            total += len(rows)
+            err_rows += [r[status_idx] for r in rows].count("error")
         log.info("Stream summary: total=%d, errors=%d", total, err_rows)
 
         # Optional: write a summary row via SP (still in same tx)
@@ -292,6 +544,8 @@ def main():
     except Exception as e:
         log.exception("Pipeline failed: %s", e)
         raise
+    finally:
+        client.close()
 
 if __name__ == "__main__":
     main()
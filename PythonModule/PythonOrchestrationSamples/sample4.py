@@ -1,12 +1,284 @@
 import os, sys
+import io
 import json
+import re
+import struct
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
 from urllib.parse import quote
 from typing import Dict, Any, Optional, Iterable
 
+import numpy as np
 import pandas as pd
-from sqlalchemy import create_engine, event, text
+from sqlalchemy import create_engine, text
 from sqlalchemy.engine import Engine, Connection
+from sqlalchemy.sql.elements import TextClause
+
+try:
+    import orjson
+except ImportError:  # optional: faster parsing of db_config.json
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # optional: multi-threaded CSV encoding for COPY
+    pa = None
+
+
+COPY_CHUNK_ROWS = 100_000  # rows encoded per block while streaming COPY FROM STDIN
+COPY_READ_SIZE = 64 * 1024  # bytes copy_expert reads (and sends) per CopyData message
+PARALLEL_COPY_ROWS = 200_000  # step 5 (parallel=True) splits larger frames across parallel COPY connections
+STAGING_SCHEMA = "etl_staging"  # dedicated schema for parallel COPY staging tables (needs CREATE on it)
+
+
+def _csv_column(s: pd.Series, keep_tz: bool = False) -> np.ndarray:
+    """
+    CSV field strings for one column (object array, '' for NULL), formatted in one pass.
+    keep_tz=True writes tz-aware datetimes as UTC instants (+00) instead of wall-clock time.
+    """
+    dtype = s.dtype
+    if pd.api.types.is_bool_dtype(dtype):
+        out = np.where(s.to_numpy(dtype=bool, na_value=False), "t", "f").astype(object)
+    elif pd.api.types.is_integer_dtype(dtype):
+        out = s.to_numpy(dtype="int64", na_value=0).astype(str).astype(object)
+    elif pd.api.types.is_float_dtype(dtype):
+        out = np.array(list(map(repr, s.to_numpy(dtype="float64", na_value=np.nan).tolist())), dtype=object)
+    elif pd.api.types.is_datetime64_any_dtype(dtype):
+        suffix = ""
+        if getattr(s.dt, "tz", None) is not None:
+            if keep_tz:
+                s, suffix = s.dt.tz_convert("UTC").dt.tz_localize(None), "+00"  # timestamptz-safe
+            else:
+                s = s.dt.tz_localize(None)  # `timestamp` staging column keeps the wall-clock time
+        out = np.char.add(np.datetime_as_string(s.to_numpy(dtype="datetime64[us]"), unit="us"),
+                          suffix).astype(object)
+    else:
+        # Always quoted, so an empty string stays distinct from NULL (unquoted empty)
+        out = np.array(['"' + str(v).replace('"', '""') + '"' for v in s.tolist()], dtype=object)
+    out[s.isna().to_numpy()] = ""
+    return out
+
+
+def _csv_block(df: pd.DataFrame, keep_tz: bool = False) -> bytes:
+    """Encode df's rows as CSV: each column is formatted once, then rows are zipped together."""
+    cols = [_csv_column(df[c], keep_tz) for c in df.columns]
+    return ("\n".join(map(",".join, zip(*cols))) + "\n").encode("utf-8")
+
+
+def _arrow_table(df: pd.DataFrame, keep_tz: bool = False):
+    """
+    df as a pyarrow Table for the Arrow CSV writer, or None (no pyarrow / unconvertible columns).
+    keep_tz=True leaves tz-aware datetimes as is (written with their UTC offset).
+    """
+    if pa is None:
+        return None
+    tz_cols = [] if keep_tz else [c for c, dt in df.dtypes.items() if isinstance(dt, pd.DatetimeTZDtype)]
+    if tz_cols:
+        # `timestamp` staging column keeps the wall-clock time, as in _csv_column
+        df = df.assign(**{c: df[c].dt.tz_localize(None) for c in tz_cols})
+    try:
+        return pa.Table.from_pandas(df, preserve_index=False)
+    except (pa.ArrowException, TypeError, ValueError):
+        return None  # e.g. mixed-type object columns; _csv_block str()s those
+
+
+def _arrow_csv_block(table) -> bytes:
+    sink = pa.BufferOutputStream()
+    # all_valid quotes every non-NULL value, so '' stays distinct from NULL (unquoted empty)
+    pa_csv.write_csv(table, sink, pa_csv.WriteOptions(include_header=False, quoting_style="all_valid"))
+    return sink.getvalue().to_pybytes()
+
+
+class _CsvCopyStream(io.RawIOBase):
+    """
+    Readable file over df's CSV encoding for copy_expert, encoded chunk_rows rows per refill.
+    Uses pyarrow's CSV writer when available, else _csv_block.
+    keep_tz=True for COPY into a real target (tz-aware datetimes keep their offset, so a
+    timestamptz column gets the right instant); the default suits `timestamp` staging tables.
+    """
+
+    def __init__(self, df: pd.DataFrame, chunk_rows: int = 50_000, keep_tz: bool = False):
+        self._df, self._chunk_rows, self._keep_tz = df, chunk_rows, keep_tz
+        self._table = _arrow_table(df, keep_tz)
+        self._next_row = 0
+        self._pending = memoryview(b"")
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._pending and self._next_row < len(self._df):
+            if self._table is not None:
+                data = _arrow_csv_block(self._table.slice(self._next_row, self._chunk_rows))
+            else:
+                data = _csv_block(self._df.iloc[self._next_row:self._next_row + self._chunk_rows], self._keep_tz)
+            self._pending = memoryview(data)
+            self._next_row += self._chunk_rows
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+# ---------- Binary COPY encoding ----------
+_PGCOPY_HEADER = b"PGCOPY\n\xff\r\n\x00" + struct.pack(">ii", 0, 0)  # signature, flags, header ext length
+_PGCOPY_TRAILER = struct.pack(">h", -1)
+_PG_EPOCH_US = 946_684_800_000_000  # 2000-01-01 00:00:00 in Unix microseconds
+
+def _binary_column(s: pd.Series, pg_type: str):
+    """
+    Fixed-width types -> (big-endian dtype, values ndarray, not-null mask);
+    text -> list of UTF-8 bytes (None for NULL).
+    """
+    mask = s.notna().to_numpy()
+    if pg_type == "bigint":
+        return ">i8", s.to_numpy(dtype="int64", na_value=0), mask
+    if pg_type == "double precision":
+        return ">f8", s.to_numpy(dtype="float64", na_value=np.nan), mask
+    if pg_type == "boolean":
+        return "?", s.to_numpy(dtype=bool, na_value=False), mask
+    if pg_type == "timestamp":
+        if getattr(s.dt, "tz", None) is not None:
+            s = s.dt.tz_localize(None)  # timestamp (without tz) keeps the wall-clock time
+        us = s.to_numpy(dtype="datetime64[us]").view("i8")
+        return ">i8", us - _PG_EPOCH_US, mask
+    return [str(v).encode("utf-8") if m else None for v, m in zip(s.tolist(), mask.tolist())]
+
+def _scatter_binary_rows(cols, n: int) -> bytes:
+    """
+    Rows with text columns (variable width): each column's NULL mask and value bytes are
+    prepared once, then its length words and values are written into one preallocated
+    buffer at per-row offsets instead of being joined row by row.
+    """
+    masks, lens = [], []  # per column: not-null mask, value byte length per row (0 for NULL)
+    for col in cols:
+        if isinstance(col, tuple):
+            be, _, mask = col
+            lens.append(mask * np.dtype(be).itemsize)
+        else:
+            mask = np.fromiter((b is not None for b in col), dtype=bool, count=n)
+            lens.append(np.fromiter((0 if b is None else len(b) for b in col), dtype=np.int64, count=n))
+        masks.append(mask)
+    row_len = 2 + 4 * len(cols) + np.sum(lens, axis=0)
+    row_start = np.zeros(n, dtype=np.int64)
+    np.cumsum(row_len[:-1], out=row_start[1:])
+    out = np.empty(int(row_len.sum()), dtype=np.uint8)
+    out[row_start[:, None] + np.arange(2)] = np.frombuffer(struct.pack(">h", len(cols)), dtype=np.uint8)
+
+    pos = row_start + 2  # start of the current field in each row
+    for col, mask, vlen in zip(cols, masks, lens):
+        word = np.where(mask, vlen, -1).astype(">i4")
+        out[pos[:, None] + np.arange(4)] = word.view(np.uint8).reshape(n, 4)
+        if isinstance(col, tuple):
+            be, vals, _ = col
+            w = np.dtype(be).itemsize
+            data = np.asarray(vals).astype(be).view(np.uint8).reshape(n, w)[mask]
+            out[(pos[mask] + 4)[:, None] + np.arange(w)] = data
+        else:
+            data = np.frombuffer(b"".join(b for b in col if b is not None), dtype=np.uint8)
+            if data.size:
+                src_start = np.cumsum(vlen) - vlen  # each row's offset into data
+                out[np.repeat(pos + 4 - src_start, vlen) + np.arange(data.size)] = data
+        pos = pos + 4 + vlen
+    return out.tobytes()
+
+def _encode_binary_rows(df: pd.DataFrame, types) -> bytes:
+    """
+    Encode df's rows as PostgreSQL binary COPY tuples (no header/trailer).
+    When every column is fixed-width the whole body is built as one NumPy structured
+    array (NULL fields get length -1 and their value bytes are masked out);
+    otherwise see _scatter_binary_rows.
+    """
+    cols = [_binary_column(df[c], t) for c, t in zip(df.columns, types)]
+    if all(isinstance(col, tuple) for col in cols):
+        row_dtype = [("nfields", ">i2")]
+        for j, (be, _, _) in enumerate(cols):
+            row_dtype += [(f"len{j}", ">i4"), (f"val{j}", be)]
+        rows = np.empty(len(df), dtype=row_dtype)
+        rows["nfields"] = len(cols)
+        for j, (be, vals, mask) in enumerate(cols):
+            rows[f"len{j}"] = np.where(mask, np.dtype(be).itemsize, -1)
+            rows[f"val{j}"] = vals
+        if all(mask.all() for _, _, mask in cols):
+            return rows.tobytes()
+        keep = np.ones((len(rows), rows.itemsize), dtype=bool)
+        for j, (be, _, mask) in enumerate(cols):
+            off = rows.dtype.fields[f"val{j}"][1]
+            keep[:, off:off + np.dtype(be).itemsize] = mask[:, None]
+        return rows.view(np.uint8).reshape(len(rows), -1)[keep].tobytes()
+    return _scatter_binary_rows(cols, len(df))
+
+class _BinaryCopyStream(io.RawIOBase):
+    """
+    Readable file over df's binary COPY stream for copy_expert: header, then
+    chunk_rows rows encoded per refill, then trailer. Memory stays ~one chunk.
+    """
+    def __init__(self, df: pd.DataFrame, types, chunk_rows: int = 50_000):
+        self._df, self._types, self._chunk_rows = df, types, chunk_rows
+        self._next_row = 0
+        self._pending = memoryview(_PGCOPY_HEADER)
+        self._trailer_sent = False
+
+    def readable(self):
+        return True
+
+    def readinto(self, b):
+        while not self._pending and not self._trailer_sent:
+            if self._next_row < len(self._df):
+                block = self._df.iloc[self._next_row:self._next_row + self._chunk_rows]
+                self._pending = memoryview(_encode_binary_rows(block, self._types))
+                self._next_row += self._chunk_rows
+            else:
+                self._pending = memoryview(_PGCOPY_TRAILER)
+                self._trailer_sent = True
+        n = min(len(b), len(self._pending))
+        b[:n] = self._pending[:n]
+        self._pending = self._pending[n:]
+        return n
+
+
+def _adbc_connect(engine: Engine):
+    """Open an ADBC (Arrow-native) PostgreSQL connection to the engine's database."""
+    try:
+        import adbc_driver_postgresql.dbapi as adbc_pg  # type: ignore
+    except ImportError as e:
+        raise ImportError("arrow=True requires 'adbc-driver-postgresql' and 'pyarrow'.") from e
+    uri = engine.url.set(drivername="postgresql").render_as_string(hide_password=False)
+    return adbc_pg.connect(uri)
+
+# text()'s own bind rule: not after a word char, ':' or '\' ('00:00:00', '::type', '\:x' stay literal)
+_NAMED_PARAM = re.compile(r"(?<![:\w\\]):(\w+)(?!:)")
+
+def _positional_sql(sql: str, params: Optional[dict]):
+    """Rewrite text()-style :name binds to libpq $n placeholders for ADBC."""
+    names = []
+    def _sub(m):
+        names.append(m.group(1))
+        return f"${len(names)}"
+    query = _NAMED_PARAM.sub(_sub, sql).replace("\\:", ":")  # text() unescapes \: too
+    return query, tuple((params or {})[n] for n in names)
+
+
+# dtype.kind -> Postgres column type (nullable Int64/Float64/boolean and tz-aware datetimes share their kinds)
+_PG_TYPE_BY_KIND = {"i": "bigint", "u": "bigint", "f": "double precision", "b": "boolean", "M": "timestamp"}
+
+def _pg_type(dtype) -> str:
+    """Basic pandas dtype -> Postgres column type mapping for staging tables."""
+    return _PG_TYPE_BY_KIND.get(dtype.kind, "text")
+
+
+@lru_cache(maxsize=8)
+def _load_envs(config_file_path: str, mtime_ns: int) -> Dict[str, Dict[str, Any]]:
+    """Parsed 'environments' section, once per (path, mtime). Callers must not mutate it."""
+    raw = Path(config_file_path).read_bytes()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+    envs = data.get("environments", {})
+    if not isinstance(envs, dict) or not envs:
+        raise ValueError(f"'environments' section missing/empty in {config_file_path}")
+    return envs
 
 
 class DBUtils:
@@ -39,16 +311,23 @@ class DBUtils:
         # Engine placeholder (set by build_engine)
         self.engine: Optional[Engine] = None
 
+        # (engine url, target table) -> column names, filled by upsert_from_temp
+        self._col_cache: Dict[tuple, list] = {}
+
+        # (procedure, param names in call order) -> CALL statement, filled by call_sp
+        self._sp_cache: Dict[tuple, TextClause] = {}
+
+        # (strategy, target, sources, key cols, data cols) -> upsert statements, filled by upsert_from_temp
+        self._upsert_cache: Dict[tuple, list] = {}
+
     # ---------- private helpers ----------
     def _load_environments(self) -> Dict[str, Dict[str, Any]]:
-        if not self.config_file_path.exists():
-            raise FileNotFoundError(f"DB config file not found: {self.config_file_path}")
-        with open(self.config_file_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
-        envs = data.get("environments", {})
-        if not isinstance(envs, dict) or not envs:
-            raise ValueError(f"'environments' section missing/empty in {self.config_file_path}")
-        return envs
+        # Re-parsed only when the file's mtime changes, not per DBUtils instance
+        try:
+            mtime_ns = self.config_file_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            raise FileNotFoundError(f"DB config file not found: {self.config_file_path}") from None
+        return _load_envs(str(self.config_file_path), mtime_ns)
 
     def _get_db_config(self, environment: str) -> Dict[str, Any]:
         if environment not in self.db_environments:
@@ -67,21 +346,28 @@ class DBUtils:
 
     # ---------- public API ----------
     def build_engine(self, environment: str, application_name: str = "python_app",
-                     statement_timeout_ms: int = 60000, lock_timeout_ms: int = 10000) -> Engine:
+                     statement_timeout_ms: int = 60000, lock_timeout_ms: int = 10000,
+                     pool_size: int = 8, max_overflow: int = 8) -> Engine:
         """
         Create and store a SQLAlchemy Engine for the given environment.
+        Session settings travel in the libpq startup packet (application_name, options),
+        so a new connection needs no extra round-trip to apply them.
         """
         dsn = self._make_dsn(environment)
-        engine = create_engine(dsn, pool_pre_ping=True, future=True)
-
-        @event.listens_for(engine, "connect")
-        def _set_session(dbapi_conn, _):
-            with dbapi_conn.cursor() as cur:
-                cur.execute("SET application_name = %s", (application_name,))
-                cur.execute("SET statement_timeout = %s", (statement_timeout_ms,))
-                cur.execute("SET lock_timeout = %s", (lock_timeout_ms,))
+        engine = create_engine(
+            dsn,
+            pool_size=pool_size,
+            max_overflow=max_overflow,
+            pool_pre_ping=True,
+            future=True,
+            connect_args={
+                "application_name": application_name,
+                "options": f"-c statement_timeout={statement_timeout_ms} -c lock_timeout={lock_timeout_ms}",
+            },
+        )
 
         self.engine = engine
+        self._col_cache.clear()
         return engine
 
     # Convenience: ensure we have an engine
@@ -91,97 +377,362 @@ class DBUtils:
         return self.engine
 
     # ----- pandas-friendly SELECT -----
-    def select_df(self, conn: Connection, sql: str, params: Optional[dict] = None) -> pd.DataFrame:
-        return pd.read_sql_query(text(sql), conn, params=params)
+    def select_df(self, conn: Connection, sql: str, params: Optional[dict] = None,
+                  stream: bool = False, chunksize: int = 50_000, arrow: bool = False) -> pd.DataFrame:
+        """
+        Build the frame from the fetched rows directly instead of going through pandas' SQL layer.
+        stream=True reads through a server-side cursor chunksize rows at a time and concatenates
+        the per-chunk frames, so only one chunk of raw row tuples is held at once.
+        arrow=True fetches an Arrow table over a separate ADBC connection (no row tuples;
+        Arrow-backed dtypes). Like select_chunks(arrow=True) it can't see conn's uncommitted writes.
+        """
+        if arrow:
+            query, args = _positional_sql(sql, params)
+            with _adbc_connect(conn.engine) as aconn, aconn.cursor() as cur:
+                cur.execute(query, args or None)
+                return cur.fetch_arrow_table().to_pandas(types_mapper=pd.ArrowDtype)
+
+        if not stream:
+            result = conn.execute(text(sql), params or {})
+            return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+
+        stmt = text(sql).execution_options(stream_results=True, max_row_buffer=chunksize)
+        result = conn.execute(stmt, params or {})
+        cols = list(result.keys())
+        frames = [pd.DataFrame.from_records(rows, columns=cols, coerce_float=True)
+                  for rows in result.partitions(chunksize)]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=cols)
 
     # ----- CALL stored procedure -----
+    def _call_stmt(self, qualified_name: str, params: Optional[dict]) -> TextClause:
+        key = (qualified_name, tuple(params or {}))  # key order is argument order, so not sorted
+        stmt = self._sp_cache.get(key)
+        if stmt is None:
+            placeholders = ", ".join(f":{k}" for k in key[1])
+            stmt = self._sp_cache[key] = text(f"CALL {qualified_name}({placeholders})")
+        return stmt
+
     def call_sp(self, conn: Connection, qualified_name: str, params: Optional[dict] = None, expect_row: bool = False):
-        placeholders = ", ".join(f":{k}" for k in (params or {}).keys())
-        stmt = text(f"CALL {qualified_name}({placeholders})") if placeholders else text(f"CALL {qualified_name}()")
-        result = conn.execute(stmt, params or {})
+        """
+        CALL a stored procedure through the cached statement from _call_stmt.
+        PostgreSQL can't PREPARE a CALL (only SELECT/INSERT/UPDATE/DELETE/MERGE/VALUES), so
+        there is no server-side prepared form; the statements inside a PL/pgSQL procedure
+        are planned once per session and reused on later calls anyway.
+        """
+        result = conn.execute(self._call_stmt(qualified_name, params), params or {})
         return result.fetchone() if expect_row else None
 
+    def call_sp_then_select(self, conn: Connection, qualified_name: str, sp_params: Optional[dict],
+                            sql: str, params: Optional[dict] = None) -> pd.DataFrame:
+        """
+        CALL a procedure (no OUT params) and run a SELECT as one multi-statement query:
+        one round-trip, psycopg2 returns the SELECT's rows. Parameter names must not collide.
+        """
+        stmt = text(self._call_stmt(qualified_name, sp_params).text + ";\n" + sql)
+        result = conn.execute(stmt, {**(sp_params or {}), **(params or {})})
+        return pd.DataFrame.from_records(result.fetchall(), columns=list(result.keys()), coerce_float=True)
+
     # ----- COPY DataFrame -> TEMP table (fast bulk load) -----
-    def copy_dataframe_to_temp(self, conn: Connection, df: pd.DataFrame, temp_table: str):
+    def copy_dataframe_to_temp(self, conn: Connection, df: pd.DataFrame, temp_table: str, binary: bool = True,
+                               chunk_rows: int = COPY_CHUNK_ROWS):
+        """
+        COPY df into a new TEMP table. binary=True (default) sends PostgreSQL's binary
+        COPY format encoded from the column arrays; binary=False keeps the CSV path.
+        Either way rows are encoded chunk_rows at a time while COPY streams.
+        """
         if df.empty:
             raise ValueError("DataFrame is empty; nothing to COPY.")
 
-        def pg_type(dtype):
-            if pd.api.types.is_integer_dtype(dtype):           return "bigint"
-            if pd.api.types.is_float_dtype(dtype):             return "double precision"
-            if pd.api.types.is_bool_dtype(dtype):              return "boolean"
-            if pd.api.types.is_datetime64_any_dtype(dtype):    return "timestamp"
-            return "text"
-
         cols = list(df.columns)
-        col_defs = ", ".join(f'"{c}" {pg_type(df[c].dtype)}' for c in cols)
+        types = [_pg_type(dt) for dt in df.dtypes]
+        col_defs = ", ".join(f'"{c}" {t}' for c, t in zip(cols, types))
+        copy_cols = '"' + '","'.join(cols) + '"'
+
+        dbapi_conn = conn.connection  # underlying psycopg2 connection
+        with dbapi_conn.cursor() as cur:
+            # One round-trip; the DROP only matters when the same tx loads the temp table twice
+            cur.execute(f"DROP TABLE IF EXISTS pg_temp.{temp_table}; "
+                        f"CREATE TEMP TABLE {temp_table} ({col_defs}) ON COMMIT DROP")
+
+            if binary:
+                # No per-cell text formatting client-side or parsing server-side
+                cur.copy_expert(f"COPY {temp_table} ({copy_cols}) FROM STDIN WITH (FORMAT BINARY)",
+                                _BinaryCopyStream(df, types, chunk_rows=chunk_rows), size=COPY_READ_SIZE)
+                return
+
+            # CSV is produced a block of rows at a time as COPY reads it (no full-size StringIO)
+            cur.copy_expert(
+                f"COPY {temp_table} ({copy_cols}) FROM STDIN WITH (FORMAT CSV)",
+                _CsvCopyStream(df, chunk_rows=chunk_rows), size=COPY_READ_SIZE
+            )
 
+    # ----- Full refresh: COPY straight into the target -----
+    def copy_dataframe_replace(self, conn: Connection, df: pd.DataFrame, target_table: str,
+                               chunk_rows: int = COPY_CHUNK_ROWS):
+        """
+        Replace target_table's rows with df: TRUNCATE + COPY into the target directly,
+        no temp table and no ON CONFLICT merge. Uses CSV (text) COPY so the target's own
+        column types apply; tz-aware datetimes keep their UTC offset (correct for timestamptz).
+        Runs in the caller's transaction.
+        """
+        copy_cols = '"' + '","'.join(df.columns) + '"'
         dbapi_conn = conn.connection  # underlying psycopg2 connection
         with dbapi_conn.cursor() as cur:
-            cur.execute(f"DROP TABLE IF EXISTS {temp_table}")
-            cur.execute(f"CREATE TEMP TABLE {temp_table} ({col_defs}) ON COMMIT DROP")
+            cur.execute(f"TRUNCATE {target_table}")
+            cur.copy_expert(
+                f"COPY {target_table} ({copy_cols}) FROM STDIN WITH (FORMAT CSV)",
+                _CsvCopyStream(df, chunk_rows=chunk_rows, keep_tz=True), size=COPY_READ_SIZE
+            )
 
-            import io
-            buf = io.StringIO()
-            df.to_csv(buf, index=False, header=False, na_rep="")
-            buf.seek(0)
+    # ----- Full refresh via an UNLOGGED copy swapped in by rename -----
+    def bulk_refresh(self, conn: Connection, df: pd.DataFrame, target_table: str,
+                     chunk_rows: int = COPY_CHUNK_ROWS):
+        """
+        Rebuild target_table from df without WAL for the loaded rows: COPY into
+        UNLOGGED {target}_new (LIKE target INCLUDING ALL), then DROP target and
+        RENAME the new table into place, all in the caller's transaction. tz-aware datetimes
+        keep their UTC offset, as in copy_dataframe_replace.
+        target_table is written as in SQL (schema.table, quoted where needed); it is resolved
+        through the catalog and every name is re-rendered with quote_ident.
+        The owner and table-level GRANTs are read from the catalog and replayed on the new
+        table before the swap. LIKE does not copy triggers, row-level security policies or
+        column-level grants, so tables that rely on them must not be refreshed this way.
+        Index and constraint names are generated from the new table (e.g.
+        processed_inputs_new_pkey) and keep that name after the rename.
+        Only for tables that can be rebuilt after a crash: the swapped-in table stays
+        UNLOGGED (truncated on crash recovery, not replicated). Views/FKs depending
+        on the target block the DROP.
+        """
+        copy_cols = '"' + '","'.join(df.columns) + '"'
+        dbapi_conn = conn.connection  # underlying psycopg2 connection
+        with dbapi_conn.cursor() as cur:
+            cur.execute(
+                """
+                SELECT quote_ident(n.nspname) || '.' || quote_ident(c.relname),
+                       quote_ident(n.nspname) || '.' || quote_ident(c.relname || '_new'),
+                       quote_ident(c.relname),
+                       quote_ident(pg_get_userbyid(c.relowner))
+                FROM pg_class c JOIN pg_namespace n ON n.oid = c.relnamespace
+                WHERE c.oid = %s::regclass
+                """,
+                (target_table,),
+            )
+            target, new_table, base_name, owner = cur.fetchone()
+            cur.execute(
+                """
+                SELECT a.privilege_type,
+                       CASE WHEN a.grantee = 0 THEN 'PUBLIC'
+                            ELSE quote_ident(pg_get_userbyid(a.grantee)) END,
+                       a.is_grantable
+                FROM pg_class c, aclexplode(c.relacl) a
+                WHERE c.oid = %s::regclass AND a.grantee <> c.relowner
+                """,
+                (target_table,),
+            )
+            grants = cur.fetchall()
+            cur.execute(f"DROP TABLE IF EXISTS {new_table}; "
+                        f"CREATE UNLOGGED TABLE {new_table} (LIKE {target} INCLUDING ALL); "
+                        f"ALTER TABLE {new_table} OWNER TO {owner}")
+            for privilege, grantee, grantable in grants:
+                cur.execute(f"GRANT {privilege} ON {new_table} TO {grantee}"
+                            + (" WITH GRANT OPTION" if grantable else ""))
             cur.copy_expert(
-                f'COPY {temp_table} ("' + '","'.join(cols) + '") FROM STDIN WITH (FORMAT CSV)',
-                buf
+                f"COPY {new_table} ({copy_cols}) FROM STDIN WITH (FORMAT CSV)",
+                _CsvCopyStream(df, chunk_rows=chunk_rows, keep_tz=True), size=COPY_READ_SIZE
             )
+            cur.execute(f"DROP TABLE {target}; ALTER TABLE {new_table} RENAME TO {base_name}")
+
+    # ----- Parallel COPY into N staging tables (large frames) -----
+    def copy_dataframe_parallel(self, df: pd.DataFrame, staging_prefix: str,
+                                staging_schema: str = STAGING_SCHEMA, n_parts: int = 4,
+                                chunk_rows: int = COPY_CHUNK_ROWS) -> list:
+        """
+        Split df into n_parts row ranges and binary-COPY them concurrently, each over its own
+        pooled connection into an UNLOGGED table committed per part (synchronous_commit off).
+        Tables are named {staging_schema}."{staging_prefix}_{run id}_{i}" with a fresh run id per
+        call, so concurrent runs never share staging tables. staging_schema must already exist
+        and grant CREATE to this role (PostgreSQL 15+ no longer grants CREATE on public).
+        Returns the table names; pass them to upsert_from_temp and drop them with drop_tables()
+        in the merging transaction. If a part fails, the parts already loaded are dropped.
+        Temp tables can't be used here: they are visible only to the connection that made them.
+        """
+        engine = self._require_engine()
+        cols = list(df.columns)
+        types = [_pg_type(dt) for dt in df.dtypes]
+        col_defs = ", ".join(f'"{c}" {t}' for c, t in zip(cols, types))
+        copy_cols = '"' + '","'.join(cols) + '"'
+        bounds = np.linspace(0, len(df), n_parts + 1, dtype=int)
+        run_id = uuid.uuid4().hex[:12]
+        tables = [f'"{staging_schema}"."{staging_prefix}_{run_id}_{i}"' for i in range(n_parts)]
+
+        def load(table, lo, hi):
+            raw = engine.raw_connection()
+            try:
+                with raw.cursor() as cur:
+                    # LOCAL: ends with this transaction, so the pooled connection doesn't carry
+                    # async commit into later transactions (the pool's reset only rolls back)
+                    cur.execute(f"SET LOCAL synchronous_commit = off; "
+                                f"CREATE UNLOGGED TABLE {table} ({col_defs})")
+                    cur.copy_expert(f"COPY {table} ({copy_cols}) FROM STDIN WITH (FORMAT BINARY)",
+                                    _BinaryCopyStream(df.iloc[lo:hi], types, chunk_rows=chunk_rows),
+                                    size=COPY_READ_SIZE)
+                raw.commit()
+            finally:
+                raw.close()  # back to the engine's pool
+
+        with ThreadPoolExecutor(max_workers=n_parts) as pool:
+            futures = [pool.submit(load, t, lo, hi) for t, lo, hi in zip(tables, bounds[:-1], bounds[1:])]
+            try:
+                for f in futures:
+                    f.result()
+            except Exception:
+                for f in futures:
+                    f.exception()  # wait for the other parts before cleaning up
+                self.discard_tables(tables)
+                raise
+        return tables
+
+    def drop_tables(self, conn: Connection, tables):
+        conn.execute(text("DROP TABLE IF EXISTS " + ", ".join(tables)))
+
+    def discard_tables(self, tables):
+        """drop_tables in its own committed transaction (cleanup after a failed/rolled-back run)."""
+        with self._require_engine().begin() as conn:
+            self.drop_tables(conn, tables)
 
     # ----- UPSERT temp -> target -----
-    def upsert_from_temp(self, conn: Connection, temp_table: str, target_table: str,
-                         key_cols: list[str], data_cols: Optional[list[str]] = None):
+    def upsert_from_temp(self, conn: Connection, temp_table, target_table: str,
+                         key_cols: list[str], data_cols: Optional[list[str]] = None,
+                         strategy: str = "on_conflict"):
+        """
+        temp_table may also be a list of staging tables (see copy_dataframe_parallel).
+        strategy:
+          - "on_conflict" (default): INSERT ... ON CONFLICT DO UPDATE (needs a unique index on key_cols)
+          - "merge":       MERGE INTO ... (PostgreSQL 15+)
+          - "anti_join":   UPDATE ... FROM, then INSERT ... WHERE NOT EXISTS (cheap for low-conflict loads)
+          - "auto":        "merge" on PostgreSQL 15+, else "on_conflict"
+          merge/anti_join/auto are opt-in: unlike ON CONFLICT they can raise a unique violation
+          when another session inserts the same key concurrently.
+        """
+        if strategy == "auto":
+            server_version = conn.connection.dbapi_connection.server_version
+            strategy = "merge" if server_version >= 150000 else "on_conflict"
+        if strategy not in ("on_conflict", "merge", "anti_join"):
+            raise ValueError(f"Unknown upsert strategy '{strategy}'")
+
         if data_cols is None:
-            schema, _, table = target_table.partition(".")
-            q = text("""
-                SELECT column_name
-                FROM information_schema.columns
-                WHERE table_name = :table
-                  AND (:schema = '' OR table_schema = :schema)
-                ORDER BY ordinal_position
-            """)
-            rows = conn.execute(q, {"table": table or target_table, "schema": schema}).fetchall()
-            target_cols = [r[0] for r in rows]
+            cache_key = (str(conn.engine.url), target_table)
+            target_cols = self._col_cache.get(cache_key)
+            if target_cols is None:
+                # regclass resolves the (optionally schema-qualified) name via search_path;
+                # pg_attribute is then a single index lookup on the table's oid
+                q = text("""
+                    SELECT attname
+                    FROM pg_attribute
+                    WHERE attrelid = CAST(:table AS regclass)
+                      AND attnum > 0 AND NOT attisdropped
+                    ORDER BY attnum
+                """)
+                rows = conn.execute(q, {"table": target_table}).fetchall()
+                target_cols = self._col_cache[cache_key] = [r[0] for r in rows]
             data_cols = [c for c in target_cols if c not in key_cols]
 
-        all_cols = key_cols + data_cols
-        quoted_cols = ", ".join(f'"{c}"' for c in all_cols)
-        conflict_cols = ", ".join(f'"{c}"' for c in key_cols)
-        updates = ", ".join(f'"{c}" = EXCLUDED."{c}"' for c in data_cols)
-
-        stmt = text(f"""
+        sources = (temp_table,) if isinstance(temp_table, str) else tuple(temp_table)
+        stmt_key = (strategy, target_table, sources, tuple(key_cols), tuple(data_cols))
+        stmts = self._upsert_cache.get(stmt_key)
+        if stmts is None:
+            stmts = self._upsert_cache[stmt_key] = self._upsert_statements(
+                strategy, target_table, sources, key_cols, data_cols)
+        for stmt in stmts:
+            conn.execute(stmt)
+
+    def _upsert_statements(self, strategy: str, target_table: str, sources: tuple,
+                           key_cols: list[str], data_cols: list[str]) -> list[TextClause]:
+        # each identifier is quoted once and reused by every clause below
+        q = {c: f'"{c}"' for c in key_cols + data_cols}
+        quoted_cols = ", ".join(q.values())
+        select_src = " UNION ALL ".join(f"SELECT {quoted_cols} FROM {t}" for t in sources)
+
+        if strategy == "on_conflict":
+            conflict_cols = ", ".join(q[c] for c in key_cols)
+            updates = ", ".join(f"{q[c]} = EXCLUDED.{q[c]}" for c in data_cols)
+            return [text(f"""
+                INSERT INTO {target_table} ({quoted_cols})
+                {select_src}
+                ON CONFLICT ({conflict_cols})
+                DO UPDATE SET {updates};
+            """)]
+
+        key_match = " AND ".join(f"x.{q[c]} = t.{q[c]}" for c in key_cols)
+        src_updates = ", ".join(f"{q[c]} = t.{q[c]}" for c in data_cols)
+        if strategy == "merge":
+            matched = f"UPDATE SET {src_updates}" if data_cols else "DO NOTHING"
+            src_values = ", ".join(f"t.{v}" for v in q.values())
+            return [text(f"""
+                MERGE INTO {target_table} AS x
+                USING ({select_src}) AS t
+                ON {key_match}
+                WHEN MATCHED THEN {matched}
+                WHEN NOT MATCHED THEN
+                    INSERT ({quoted_cols}) VALUES ({src_values});
+            """)]
+
+        # anti_join: update existing keys first so the inserted rows aren't touched twice
+        stmts = []
+        if data_cols:
+            stmts.append(text(f"""
+                UPDATE {target_table} AS x SET {src_updates}
+                FROM ({select_src}) AS t
+                WHERE {key_match};
+            """))
+        stmts.append(text(f"""
             INSERT INTO {target_table} ({quoted_cols})
-            SELECT {quoted_cols} FROM {temp_table}
-            ON CONFLICT ({conflict_cols})
-            DO UPDATE SET {updates};
-        """)
-        conn.execute(stmt)
-
+            SELECT {quoted_cols} FROM ({select_src}) AS t
+            WHERE NOT EXISTS (SELECT 1 FROM {target_table} AS x WHERE {key_match});
+        """))
+        return stmts
 
-    # ---- Optional: streaming SELECT in chunks (pandas) ----
     def select_chunks(
         self,
         conn: Connection,
         sql: str,
         params: Optional[dict] = None,
         chunksize: int = 10_000,
+        arrow: bool = False,
     ) -> Iterable[pd.DataFrame]:
-        for chunk in pd.read_sql_query(text(sql), conn, params=params, chunksize=chunksize):
-            yield chunk
+        """
+        Server-side cursor (stream_results), so client memory stays ~chunksize rows:
+        each partition of fetched rows becomes one DataFrame.
+        arrow=True reads Arrow record batches over a separate ADBC connection instead
+        (no per-row tuples; chunk sizes follow the driver's batches). That connection
+        is its own session, so it doesn't see conn's uncommitted writes.
+        """
+        if arrow:
+            query, args = _positional_sql(sql, params)
+            with _adbc_connect(conn.engine) as aconn, aconn.cursor() as cur:
+                cur.execute(query, args or None)
+                for batch in cur.fetch_record_batch():
+                    yield batch.to_pandas()
+            return
+
+        stmt = text(sql).execution_options(stream_results=True, max_row_buffer=chunksize)
+        result = conn.execute(stmt, params or {})
+        cols = list(result.keys())
+        for rows in result.partitions(chunksize):
+            yield pd.DataFrame.from_records(rows, columns=cols, coerce_float=True)
 
 
 # ---------- Optional pandas transform ----------
 def transform(df: pd.DataFrame) -> pd.DataFrame:
     if df.empty:
         return df
-    df = df[df["status"].isin(["ready", "finished"])].copy()
+    df = df[df["status"].isin(["ready", "finished"]).to_numpy(dtype=bool)]
     if "value" in df.columns:
-        df["value"] = pd.to_numeric(df["value"], errors="coerce").fillna(0.0)
-        mean = df["value"].mean()
-        std  = df["value"].std() or 1.0
-        df["value_norm"] = (df["value"] - mean) / std
+        # One float64 array for fill, mean and std; new columns attached in a single assign
+        v = pd.to_numeric(df["value"], errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan, copy=True)
+        np.nan_to_num(v, copy=False, nan=0.0)
+        std = v.std(ddof=1) if v.size > 1 else 0.0  # sample std, as Series.std()
+        df = df.assign(value=v, value_norm=(v - (v.mean() if v.size else 0.0)) / (std or 1.0))
     return df
 
 # ---------- Steps using DBUtils ----------
@@ -195,22 +746,47 @@ def step_1_read_initial(db: DBUtils, conn: Connection, since_ts: str) -> pd.Data
     print(f"[Step 1] fetched rows: {len(df)}")
     return df
 
-def step_3_pre_ingest(db: DBUtils, conn: Connection, since_ts: str):
+def step_3_4_pre_ingest_and_reference(db: DBUtils, conn: Connection, since_ts: str) -> pd.DataFrame:
+    # Step 4 doesn't depend on anything step 3 returns, so both go in one round-trip
     print("[Step 3] CALL public.pre_ingest_check")
-    db.call_sp(conn, "public.pre_ingest_check", {"since_ts": since_ts}, expect_row=False)
-
-def step_4_read_reference(db: DBUtils, conn: Connection) -> pd.DataFrame:
-    ref = db.select_df(conn, "SELECT code, multiplier FROM public.ref_multipliers")
+    ref = db.call_sp_then_select(conn, "public.pre_ingest_check", {"since_ts": since_ts},
+                                 "SELECT code, multiplier FROM public.ref_multipliers")
     print(f"[Step 4] reference rows: {len(ref)}")
     return ref
 
-def step_5_dump_processed(db: DBUtils, conn: Connection, df_processed: pd.DataFrame):
+def step_5_dump_processed(db: DBUtils, conn: Connection, df_processed: pd.DataFrame,
+                          full_refresh: bool = False, unlogged: bool = False, parallel: bool = False):
     if df_processed.empty:
         print("[Step 5] nothing to dump (empty DataFrame)")
         return
     temp   = "temp_processed_input"
     target = "public.processed_inputs"
     key_cols = ["job_id"]  # must be a UNIQUE/PK on target
+    if full_refresh and unlogged:
+        # Target is rebuilt from this frame as an UNLOGGED table swapped in by rename (no WAL)
+        print(f"[Step 5] UNLOGGED COPY {len(df_processed)} rows -> {target}_new -> swap")
+        db.bulk_refresh(conn, df_processed, target_table=target)
+        return
+    if full_refresh:
+        # Target is rebuilt from this frame: no temp table, no merge
+        print(f"[Step 5] TRUNCATE + COPY {len(df_processed)} rows -> {target}")
+        db.copy_dataframe_replace(conn, df_processed, target_table=target)
+        return
+    if parallel and len(df_processed) > PARALLEL_COPY_ROWS:
+        # Opt-in: parts load over separate connections into committed per-run staging tables
+        # in STAGING_SCHEMA; the merge and the cleanup stay in this transaction.
+        print(f"[Step 5] parallel COPY {len(df_processed)} rows -> STAGING x4 -> UPSERT {target}")
+        staging = db.copy_dataframe_parallel(df_processed, staging_prefix="stg_processed_input")
+        try:
+            # Savepoint: on failure its rollback releases our locks on the staging tables,
+            # so discard_tables (another session) can drop them without waiting on us
+            with conn.begin_nested():
+                db.upsert_from_temp(conn, temp_table=staging, target_table=target, key_cols=key_cols)
+        except Exception:
+            db.discard_tables(staging)
+            raise
+        db.drop_tables(conn, staging)
+        return
     print(f"[Step 5] COPY {len(df_processed)} rows -> TEMP -> UPSERT {target}")
     db.copy_dataframe_to_temp(conn, df_processed, temp_table=temp)
     db.upsert_from_temp(conn, temp_table=temp, target_table=target, key_cols=key_cols)
@@ -221,8 +797,12 @@ def step_6_post_ingest(db: DBUtils, conn: Connection, since_ts: str):
 
 # ---------- (Optional) verify session settings ----------
 def verify_session(conn: Connection):
-    for setting in ("application_name", "statement_timeout", "lock_timeout"):
-        val = conn.execute(text(f"SHOW {setting}")).scalar_one()
+    settings = ("application_name", "statement_timeout", "lock_timeout")
+    # current_setting() == SHOW, but all three come back in one round-trip
+    row = conn.execute(text(
+        "SELECT " + ", ".join(f"current_setting('{s}')" for s in settings)
+    )).one()
+    for setting, val in zip(settings, row):
         print(f"[Session] {setting} = {val}")
 
 # ---------- Orchestrator ----------
@@ -247,15 +827,16 @@ def run_pipeline():
             print("[Step 2] pandas transforms")
             df_processed = transform(df_raw)
 
-            # 3) SP A
-            step_3_pre_ingest(db, conn, SINCE_TS)
-
-            # 4) read again (e.g., lookup) and optionally join
-            df_ref = step_4_read_reference(db, conn)
-            if not df_processed.empty and not df_ref.empty and "code" in df_processed.columns:
-                df_processed = df_processed.merge(df_ref, on="code", how="left")
-                if "multiplier" in df_processed.columns and "value" in df_processed.columns:
-                    df_processed["value_x_mult"] = df_processed["value"] * df_processed["multiplier"].fillna(1.0)
+            # 3) SP A + 4) read again (e.g., lookup) and optionally join
+            df_ref = step_3_4_pre_ingest_and_reference(db, conn, SINCE_TS)
+            if (not df_processed.empty and not df_ref.empty
+                    and "code" in df_processed.columns and "multiplier" in df_ref.columns):
+                # Small lookup -> dict probe via Series.map instead of a merge into a new frame
+                mult_map = dict(zip(df_ref["code"].tolist(), df_ref["multiplier"].tolist()))
+                df_processed["multiplier"] = df_processed["code"].map(mult_map)
+                if "value" in df_processed.columns:
+                    mult = df_processed["multiplier"].to_numpy(dtype=np.float64, na_value=np.nan)
+                    df_processed["value_x_mult"] = df_processed["value"].to_numpy() * np.where(np.isnan(mult), 1.0, mult)
 
             # 5) upsert processed data
             step_5_dump_processed(db, conn, df_processed)